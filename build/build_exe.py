@@ -29,11 +29,14 @@ def build_exe():
     cmd = [
         "pyinstaller",
         "--name=GradingSystem",
-        "--onefile",
+        # 使用目录模式：单文件模式每次启动都要先解压数百 MB 到临时目录
+        "--onedir",
+        "--contents-directory=_internal",
         "--windowed",
         "--add-data=config;config",
         "--add-data=src;src",
-        "--hidden-import=PIL._tkinter_finder",
+        "--exclude-module=tkinter",
+        "--exclude-module=matplotlib.tests",
         "--hidden-import=playwright.async_api",
         "--hidden-import=paddleocr",
         "--hidden-import=paddlepaddle",
@@ -52,7 +55,8 @@ def build_exe():
 
         print("-" * 60)
         print("\n打包成功！")
-        print(f"\n可执行文件位置: {os.path.join(project_root, 'dist', 'GradingSystem.exe')}")
+        print(f"\n可执行文件位置: {os.path.join(project_root, 'dist', 'GradingSystem', 'GradingSystem.exe')}")
+        print("分发时请复制整个 dist/GradingSystem 目录（如需单文件安装包，可用 Inno Setup/NSIS 打包该目录）")
 
     except subprocess.CalledProcessError as e:
         print(f"\n打包失败: {e}")
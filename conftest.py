@@ -0,0 +1 @@
+# 使 pytest 将项目根目录加入 sys.path，测试可直接导入 src 包
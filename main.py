@@ -8,10 +8,8 @@ import sys
 import os
 import time
 import logging
-from io import BytesIO
-from typing import Optional
-
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 
 from src.utils.config_loader import ConfigLoader
 from src.utils.logger import Logger
@@ -56,33 +54,60 @@ class GradingSystem:
         self.ai_client = AIClient(config["settings"]["ai"])
 
         # 初始化 OCR 引擎
-        ocr_config = config["settings"]["get("ocr", {}")"]
+        ocr_config = config["settings"].get("ocr", {})
         self.ocr = OCREngine(ocr_config)
 
+        # OCR 专用线程池：OCR 不阻塞事件循环，同时限制并发访问 PaddleOCR 的线程数
+        self._ocr_pool = ThreadPoolExecutor(
+            max_workers=ocr_config.get("max_workers", 1),
+            thread_name_prefix="ocr"
+        )
+
         # 初始化判卷器和评分计算器
-        questions = config["questions"]["questions"]
+        self._questions = config["questions"]["questions"]
         template = config["questions"].get("prompt_template") or PromptTemplates.get_template()
         self.judge = AIJudge(self.ai_client, template)
         passing_score = config["questions"].get("scoring", {}).get("passing_score", 60)
-        self.calculator = ScoreCalculator(questions, passing_score)
+        self.calculator = ScoreCalculator(self._questions, passing_score)
+
+        # 预先读取每张试卷都要用到的页面配置
+        browser_config = config["browser"]
+        selectors = browser_config.get("selectors", {})
+        automation_config = browser_config.get("automation", {})
+        self._image_selector = selectors.get("exam_image", "#exam-container img")
+        self._score_selector = selectors.get("score_input", "input[name='score']")
+        self._next_selector = selectors.get("next_button", "button.next-exam")
+        self._wait_after_fill_ms = automation_config.get("wait_after_fill", 500)
+        self._wait_next_exam_ms = automation_config.get("wait_next_exam", 10000)
+        self._timeout_ms = browser_config.get("browser", {}).get("timeout", 30000)
 
         # 自动化组件（延迟初始化）
         self.browser: Optional[BrowserController] = None
         self.screenshot: Optional[Screenshot] = None
         self.form_filler: Optional[FormFiller] = None
 
+        self._warm_up_task: Optional[asyncio.Task] = None
+
     async def start(self):
         """启动系统"""
-        # 授权验证
-        if self.license_manager and not self.license_manager.is_authorized():
-            license_code = input("请输入授权码: ")
-            if not self.license_manager.verify_license(license_code):
-                logger.error("授权验证失败！")
-                sys.exit(1)
-            if not self.license_manager.save_license(license_code):
-                logger.error("授权保存失败！")
-                sys.exit(1)
-            logger.info("授权验证成功！")
+        # 浏览器启动与授权码输入同时进行，授权通过后再等待浏览器就绪
+        self.browser = BrowserController(self.config["browser"])
+        browser_task = asyncio.create_task(self.browser.start())
+
+        try:
+            authorized = await self._verify_license()
+        except BaseException:
+            await self._abort_browser_start(browser_task)
+            raise
+
+        if not authorized:
+            await self._abort_browser_start(browser_task)
+            sys.exit(1)
+
+        await browser_task
+
+        # 授权通过后在后台预热 OCR 和 AI 客户端，不等待预热完成
+        self._warm_up_task = asyncio.create_task(self._warm_up())
 
         # 显示授权信息
         if self.license_manager:
@@ -91,15 +116,17 @@ class GradingSystem:
             if info.get("authorized"):
                 logger.info(f"有效期至: {info.get('valid_until')}")
 
-        # 初始化浏览器
-        self.browser = BrowserController(self.config["browser"])
-        await self.browser.start()
-
         page = await self.browser.get_page()
 
         # 初始化截图和表单填写工具
         screenshot_dir = self.config["settings"]["app"].get("screenshot_dir", "screenshots")
-        self.screenshot = Screenshot(page, save_dir=screenshot_dir)
+        screenshot_config = self.config["browser"].get("screenshot", {})
+        self.screenshot = Screenshot(
+            page,
+            save_dir=screenshot_dir,
+            image_format=screenshot_config.get("format", "png"),
+            jpeg_quality=screenshot_config.get("quality", 70)
+        )
         self.form_filler = FormFiller(page)
 
         # 导航到目标页面
@@ -107,78 +134,155 @@ class GradingSystem:
         await self.browser.navigate(url)
         logger.info(f"已打开页面: {url}")
 
-    async def process_exam(self) -> bool:
+    async def _verify_license(self) -> bool:
         """
-        处理一张试卷
+        授权验证（未授权时提示输入授权码）
 
         Returns:
-            是否成功处理
+            是否授权成功
         """
-        browser_config = self.config["browser"]
-        selectors = browser_config.get("selectors", {})
-        automation_config = browser_config.get("automation", {})
+        if self.license_manager and not await asyncio.to_thread(self.license_manager.is_authorized):
+            # 输入、验证和保存都在线程中执行（远程验证会发起网络请求），不阻塞事件循环中的浏览器启动
+            license_code = await asyncio.to_thread(input, "请输入授权码: ")
+            if not await asyncio.to_thread(self.license_manager.verify_license, license_code):
+                logger.error("授权验证失败！")
+                return False
+            if not await asyncio.to_thread(self.license_manager.save_license, license_code):
+                logger.error("授权保存失败！")
+                return False
+            logger.info("授权验证成功！")
 
-        try:
-            # 等待试卷图片加载
-            image_selector = selectors.get("exam_image", "#exam-container img")
-            logger.info("等待试卷图片加载...")
+        return True
 
-            timeout = 30000  # 30秒超时
-            await self.browser.wait_for_element(image_selector, timeout=timeout)
+    async def _abort_browser_start(self, browser_task: asyncio.Task) -> None:
+        """
+        取消尚未完成的浏览器启动，并关闭已经打开的部分
 
-            # 截取试卷图片
-            logger.info("截取试卷图片...")
-            image_data = await self.screenshot.capture_element(image_selector)
+        Args:
+            browser_task: 浏览器启动任务
+        """
+        browser_task.cancel()
+        await asyncio.gather(browser_task, return_exceptions=True)
+        await self.browser.close()
+
+    async def _warm_up(self) -> None:
+        """预热 OCR 模型和 AI 连接（失败不影响后续阅卷）"""
+        logger.info("预热 OCR 引擎和 AI 客户端...")
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            loop.run_in_executor(self._ocr_pool, self.ocr.warm_up),
+            self.ai_client.ping(timeout=5.0),
+            return_exceptions=True
+        )
+        for name, result in zip(("OCR 引擎", "AI 客户端"), results):
+            if isinstance(result, Exception):
+                logger.warning(f"{name}预热失败: {result}")
+
+    async def _capture_exam(self) -> bytes:
+        """
+        等待并截取试卷图片
 
-            # OCR 识别
-            logger.info("识别试卷文字...")
-            image = Image.open(BytesIO(image_data))
-            ocr_results = self.ocr.recognize(image)
+        Returns:
+            截图数据（bytes）
+        """
+        # 等待试卷图片加载并截图
+        logger.info("等待并截取试卷图片...")
+        return await self.screenshot.capture_element(self._image_selector, timeout=self._timeout_ms)
 
-            # 拼接识别文本
-            recognized_text = "\n".join([item["text"] for item in ocr_results])
-            logger.info(f"识别到文字: {len(recognized_text)} 字符")
+    async def _recognize_exam(self, image_data: bytes) -> str:
+        """
+        OCR 识别试卷文字
 
-            # AI 判卷
-            logger.info("AI 判卷中...")
-            questions = self.config["questions"]["questions"]
+        Args:
+            image_data: 截图数据
 
-            judge_results = []
-            for question in questions:
-                result = self.judge.judge(question, recognized_text)
-                judge_results.append(result)
-                logger.debug(f"题目 {question.get('id')}: {result.get('score')}/{question.get('points')} 分")
+        Returns:
+            拼接后的识别文本
+        """
+        logger.info("识别试卷文字...")
+        # 截图字节由 OCR 引擎在 OCR 线程中直接解码为 BGR 数组，不占用事件循环
+        ocr_results = await self._run_ocr(image_data)
+
+        # 拼接识别文本
+        recognized_text = "\n".join([item["text"] for item in ocr_results])
+        logger.info(f"识别到文字: {len(recognized_text)} 字符")
+        return recognized_text
+
+    async def _run_ocr(self, image) -> list:
+        """
+        在 OCR 线程池中执行识别
+
+        Args:
+            image: 图片数组或编码后的图片字节
+
+        Returns:
+            OCR 识别结果列表
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._ocr_pool, self.ocr.recognize, image)
+
+    async def _judge_exam(self, recognized_text: str) -> Dict[str, Any]:
+        """
+        AI 判卷并生成评分报告
+
+        Args:
+            recognized_text: 识别出的试卷文本
+
+        Returns:
+            评分报告
+        """
+        logger.info("AI 判卷中...")
+        questions = self._questions
+
+        # 并发判阅所有题目，结果顺序与题目顺序一致
+        judge_results = await self.judge.judge_batch(
+            [(question, recognized_text) for question in questions],
+            concurrency=self.ai_client.max_concurrency
+        )
+        for question, result in zip(questions, judge_results):
+            logger.debug("题目 %s: %s/%s 分", question.get("id"), result.get("score"), question.get("points"))
+
+        # 计算总分
+        report = self.calculator.generate_report(judge_results)
 
-            # 计算总分
-            report = self.calculator.generate_report(judge_results)
-            total_score = report["total_score"]
+        logger.info(f"判卷完成！得分: {report['total_score']}/{report['max_score']} ({report['percentage']}%)")
+        logger.info(f"及格: {'是' if report['passed'] else '否'}")
+        return report
 
-            logger.info(f"判卷完成！得分: {total_score}/{report['max_score']} ({report['percentage']}%)")
-            logger.info(f"及格: {'是' if report['passed'] else '否'}")
+    async def _fill_exam(self, report: Dict[str, Any]) -> None:
+        """
+        填写分数并切换到下一张试卷
 
-            # 填写分数
-            score_input_selector = selectors.get("score_input", "input[name='score']")
-            wait_after_fill = automation_config.get("wait_after_fill", 500)
+        Args:
+            report: 评分报告
+        """
+        # 填写分数
+        await self.form_filler.fill_input(self._score_selector, report["total_score"])
+        logger.info("分数已填写")
 
-            await self.form_filler.fill_input(score_input_selector, total_score)
-            await asyncio.sleep(wait_after_fill / 1000)  # 转换为秒
-            logger.info("分数已填写")
+        # 等待下一张按钮可用，最多等待 wait_after_fill 毫秒，页面就绪后立即继续
+        await self.browser.wait_for_enabled(self._next_selector, timeout=self._wait_after_fill_ms)
 
-            # 点击下一张
-            next_button_selector = selectors.get("next_button", "button.next-exam")
-            await self.form_filler.click_button(next_button_selector)
-            logger.info("已点击下一张")
+        # 标记当前试卷图片，点击下一张后等待图片切换，页面一更新就继续
+        previous_src = await self.browser.mark_element(self._image_selector)
 
-            return True
+        # 点击下一张
+        await self.form_filler.click_button(self._next_selector)
+        logger.info("已点击下一张")
 
-        except Exception as e:
-            logger.error(f"处理试卷失败: {e}", exc_info=True)
-            return False
+        if not await self.browser.wait_for_element_change(
+            self._image_selector, previous_src, timeout=self._wait_next_exam_ms
+        ):
+            # 有的页面切换试卷时图片元素和地址都不变，无法判断是否已切换，超时后继续处理
+            logger.warning("等待下一张试卷切换超时（%sms），继续处理", self._wait_next_exam_ms)
 
     async def run(self, max_exams: int = None):
         """
         运行阅卷系统
 
+        页面同时只显示一张试卷，填写并切换到下一张后才能截取下一张，
+        因此各阶段按顺序执行；截图等待、OCR、判卷内部各自不阻塞事件循环。
+
         Args:
             max_exams: 最大处理试卷数（None 表示无限）
         """
@@ -189,27 +293,31 @@ class GradingSystem:
             logger.info(f"处理第 {processed + 1} 张试卷")
             logger.info(f"{'=' * 50}\n")
 
-            success = await self.process_exam()
-
-            if success:
-                processed += 1
-            else:
+            try:
+                image_data = await self._capture_exam()
+                recognized_text = await self._recognize_exam(image_data)
+                report = await self._judge_exam(recognized_text)
+                await self._fill_exam(report)
+            except Exception as e:
+                logger.error(f"处理试卷失败: {e}", exc_info=True)
                 logger.error("处理失败，停止运行")
                 break
 
-            # 等待一段时间再处理下一张
-            wait_time = 2
-            logger.info(f"等待 {wait_time} 秒后处理下一张...")
-            await asyncio.sleep(wait_time)
+            processed += 1
 
         logger.info(f"\n处理完成！共处理 {processed} 张试卷")
 
     async def shutdown(self):
         """关闭系统"""
+        if self._warm_up_task and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+
         if self.browser:
             await self.browser.close()
             logger.info("浏览器已关闭")
 
+        self._ocr_pool.shutdown(wait=False, cancel_futures=True)
+
 
 async def main():
     """主函数"""
@@ -237,5 +345,20 @@ async def main():
             await system.shutdown()
 
 
+def install_event_loop() -> None:
+    """安装更快的事件循环实现（uvloop / winloop），未安装时使用默认事件循环"""
+    try:
+        if sys.platform == "win32":
+            # Playwright 在 Windows 上依赖 Proactor 的子进程支持，不能换成 Selector 事件循环
+            import winloop as loop_impl
+        else:
+            import uvloop as loop_impl
+    except ImportError:
+        return
+
+    loop_impl.install()
+
+
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(main())
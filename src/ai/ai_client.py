@@ -3,13 +3,30 @@ AI 客户端模块
 
 统一接口支持本地模型和商业 API 调用
 """
-from typing import Dict, Any, List, Optional
-import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
 
 try:
-    from openai import OpenAI
+    import diskcache
 except ImportError:
-    OpenAI = None
+    diskcache = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# 匹配 markdown 代码块中的 JSON，或文本中最外层的 {...}
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```|(\{.*\})", re.DOTALL)
 
 
 class AIClient:
@@ -22,23 +39,47 @@ class AIClient:
         Args:
             config: AI 配置字典
         """
-        if OpenAI is None:
-            raise ImportError("请先安装 openai 包: pip install openai")
-
         self.mode = config.get("mode", "api")
         self.timeout = config.get("timeout", 60)
         self.max_retries = config.get("max_retries", 3)
         self.temperature = config.get("temperature", 0.3)
+        self.max_concurrency = config.get("max_concurrency", 8)
+        self.prompt_cache = config.get("prompt_cache", True)
 
         self.client = self._init_client(config)
 
+        # 限制并发请求数，避免触发服务商限流
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # 同步接口专用的事件循环：客户端连接池和信号量绑定在首次使用的循环上，
+        # 每次 asyncio.run 新建循环会导致 "Event loop is closed"
+        self._sync_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 响应缓存（仅缓存 temperature=0 且调用方校验通过的结果）
+        self.cache_enabled = config.get("cache", True)
+        self.cache_size = config.get("cache_size", 1024)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._disk_cache = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        cache_dir = config.get("cache_dir")
+        if self.cache_enabled and cache_dir and diskcache is not None:
+            self._disk_cache = diskcache.Cache(os.path.join(cache_dir, "ai_cache"))
+
     def _init_client(self, config: Dict[str, Any]):
-        """初始化 OpenAI 客户端"""
+        """初始化 OpenAI 异步客户端"""
+        # 延迟导入 openai，加快程序启动
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            raise ImportError("请先安装 openai 包: pip install openai")
+
         if self.mode == "local":
             # 本地模式：使用 Ollama、LM Studio 等
             local_config = config.get("local", {})
             self.model = local_config.get("model", "llama3.2")
-            return OpenAI(
+            return AsyncOpenAI(
                 base_url=local_config.get("base_url", "http://localhost:11434/v1"),
                 api_key="dummy-key"  # 本地模式不需要真实 API key
             )
@@ -54,25 +95,26 @@ class AIClient:
             base_url = api_config.get("base_url")
             if base_url:
                 # 使用自定义 endpoint（如 DeepSeek、通义千问等）
-                return OpenAI(
+                return AsyncOpenAI(
                     base_url=base_url,
                     api_key=api_key
                 )
             else:
                 # 使用官方 OpenAI API
-                return OpenAI(api_key=api_key)
+                return AsyncOpenAI(api_key=api_key)
 
-    def chat(
+    async def chat(
         self,
         messages: List[Dict[str, str]],
         **kwargs
     ) -> str:
         """
-        发送聊天请求
+        发送聊天请求（受并发数限制）
 
         Args:
             messages: 消息列表，格式为 [{"role": "user", "content": "..."}]
-            **kwargs: 额外参数
+            **kwargs: 额外参数，cache_key 作为 prompt_cache_key 发送，
+                使相同前缀的请求路由到同一缓存节点
 
         Returns:
             AI 响应文本
@@ -85,23 +127,63 @@ class AIClient:
             "timeout": kwargs.get("timeout", self.timeout)
         }
 
-        # 重试机制
+        if "max_tokens" in kwargs:
+            params["max_tokens"] = kwargs["max_tokens"]
+
+        cache_key = kwargs.get("cache_key")
+        if self.prompt_cache and cache_key:
+            params["extra_body"] = {"prompt_cache_key": cache_key}
+
+        # 重试机制：每次请求单独占用并发名额，退避等待时释放，不阻塞其他请求
         for attempt in range(self.max_retries):
             try:
-                response = self.client.chat.completions.create(**params)
+                async with self._semaphore:
+                    response = await self.client.chat.completions.create(**params)
                 return response.choices[0].message.content or ""
 
             except Exception as e:
                 if attempt == self.max_retries - 1:
                     raise RuntimeError(f"AI 调用失败（重试 {self.max_retries} 次后）: {e}")
 
-                # 指数退避
-                wait_time = (attempt + 1) * 2
-                time.sleep(wait_time)
+            # 指数退避
+            wait_time = (attempt + 1) * 2
+            await asyncio.sleep(wait_time)
+
+    def chat_sync(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> str:
+        """
+        同步发送聊天请求（供非异步调用方使用，不能在事件循环内调用）
+
+        Args:
+            messages: 消息列表
+            **kwargs: 额外参数
+
+        Returns:
+            AI 响应文本
+        """
+        return self.run_sync(self.chat(messages, **kwargs))
+
+    def run_sync(self, coro):
+        """
+        在同步接口专用的事件循环中运行协程（同一客户端不要同时用于其他事件循环）
+
+        Args:
+            coro: 要运行的协程
+
+        Returns:
+            协程返回值
+        """
+        if self._sync_loop is None or self._sync_loop.is_closed():
+            self._sync_loop = asyncio.new_event_loop()
+        return self._sync_loop.run_until_complete(coro)
 
-    def chat_json(
+    async def chat_json(
         self,
         messages: List[Dict[str, str]],
+        validator: Optional[Callable[[Dict[str, Any]], bool]] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -109,31 +191,134 @@ class AIClient:
 
         Args:
             messages: 消息列表
+            validator: 结果校验函数，仅在提供时才缓存 temperature=0 的请求，
+                且只缓存校验通过的结果
             **kwargs: 额外参数
 
         Returns:
             解析后的 JSON 字典
         """
-        import json
+        temperature = kwargs.get("temperature", self.temperature)
+        cache_key = None
+        if self.cache_enabled and validator is not None and temperature == 0:
+            cache_key = self._make_cache_key(messages, temperature)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self._cache_hits += 1
+                logger.debug("AI 缓存命中，命中率: %.1f%%", self._cache_hit_rate() * 100)
+                return dict(cached)
+            self._cache_misses += 1
 
-        response_text = self.chat(messages, **kwargs)
+        response_text = await self.chat(messages, **kwargs)
+        result = self._parse_json(response_text)
+
+        # 解析失败或校验不通过的结果不缓存，下次重新请求
+        if cache_key and "raw" not in result and validator(result):
+            self._cache_set(cache_key, result)
+            logger.debug("AI 缓存未命中，命中率: %.1f%%", self._cache_hit_rate() * 100)
+
+        return result
+
+    def _make_cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float
+    ) -> str:
+        """
+        计算请求的缓存键
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+
+        Returns:
+            缓存键（SHA-256 十六进制）
+        """
+        payload = json.dumps(
+            {"model": self.model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """从内存或磁盘缓存读取结果"""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        elif self._disk_cache is not None:
+            result = self._disk_cache.get(key)
+            if result is not None:
+                self._remember(key, result)
+        return result
+
+    def _cache_set(self, key: str, result: Dict[str, Any]) -> None:
+        """写入内存和磁盘缓存"""
+        self._remember(key, result)
+        if self._disk_cache is not None:
+            self._disk_cache.set(key, result)
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        """写入内存缓存，超出容量时淘汰最久未使用的条目"""
+        if self.cache_size <= 0:
+            return
+
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_hit_rate(self) -> float:
+        """计算缓存命中率"""
+        total = self._cache_hits + self._cache_misses
+        return self._cache_hits / total if total else 0.0
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取响应缓存统计信息
+
+        Returns:
+            包含命中数、未命中数和命中率的字典
+        """
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": self._cache_hit_rate()
+        }
+
+    def _parse_json(self, response_text: str) -> Dict[str, Any]:
+        """
+        解析 AI 响应中的 JSON
+
+        Args:
+            response_text: AI 响应文本
+
+        Returns:
+            解析后的 JSON 字典，解析失败时返回 {"raw": 原始文本}
+        """
+        match = _JSON_BLOCK.search(response_text)
+        payload = (match.group(1) or match.group(2)) if match else response_text
 
-        # 尝试解析 JSON
         try:
-            # 移除可能的 markdown 代码块标记
-            text = response_text.strip()
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-
-            return json.loads(text.strip())
-        except json.JSONDecodeError:
+            return _json_loads(payload)
+        except ValueError:
             # JSON 解析失败，返回原始文本
             return {"raw": response_text}
 
+    async def ping(self, timeout: float = 5.0) -> None:
+        """
+        发送一次最小请求以建立连接（不重试，用于预热）
+
+        Args:
+            timeout: 超时时间（秒）
+        """
+        client = self.client.with_options(max_retries=0, timeout=timeout)
+        await client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1
+        )
+
     def get_model_info(self) -> Dict[str, str]:
         """
         获取当前模型信息
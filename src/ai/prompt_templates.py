@@ -2,65 +2,79 @@
 提示词模板模块
 
 管理判卷相关的提示词模板
+
+模板按“静态内容在前、动态内容在后”组织：角色、评分标准和输出格式等
+固定内容放在前面，题目和答案等每次调用都不同的内容放在最后，
+以便服务商的提示词前缀缓存（prompt caching）命中。
 """
+import functools
+from string import Formatter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
-class PromptTemplates:
-    """提示词模板类"""
+_FORMATTER = Formatter()
 
-    # 默认判卷提示词模板
-    DEFAULT_JUDGE_TEMPLATE = """你是一个阅卷专家，请根据以下信息判阅学生的答案。
+# 所有模板共用的评分通则和输出格式说明（静态内容）
+_COMMON_RULES = """
+通用评分规则：
+1. 只依据标准答案和题目要求评分，不要因为字迹、排版或识别噪声扣分
+2. 学生答案来自 OCR 识别，可能夹杂其他题目的内容或错别字，请只关注与本题相关的部分
+3. 学生答案为空、与题目无关或仅抄写题目时，给 0 分
+4. 给分范围为 0 到满分之间，可以给小数分，但不得超过满分
+5. 评语用一到两句话说明给分理由，指出主要得分点和失分点
+
+请以JSON格式返回结果，不要输出 JSON 以外的任何内容，格式如下：
+{{"score": 实际得分, "comment": "评语"}}
+
+以下是本题信息：
+"""
 
+# 所有模板共用的题目信息（动态内容）
+JUDGE_SUFFIX = """
 题目：{question}
 标准答案：{standard_answer}
 学生答案：{student_answer}
 满分：{max_points}
+"""
+
+
+class PromptTemplates:
+    """提示词模板类"""
+
+    # 默认判卷提示词模板
+    DEFAULT_JUDGE_PREFIX = """你是一个阅卷专家，请根据标准答案判阅学生的答案。
 
 请严格按照以下要求判阅：
 1. 仔细比较学生答案与标准答案
 2. 根据答案的完整性和正确性给分
-3. 给分范围：0-{max_points}分
-4. 必须给出简要评语说明给分理由
-
-请以JSON格式返回结果，格式如下：
-{{"score": 实际得分, "comment": "评语"}}
-"""
+3. 必须给出简要评语说明给分理由
+""" + _COMMON_RULES
 
     # 严格判卷提示词
-    STRICT_JUDGE_TEMPLATE = """你是一个严格的阅卷专家，请根据以下信息判阅学生的答案。
-
-题目：{question}
-标准答案：{standard_answer}
-学生答案：{student_answer}
-满分：{max_points}
+    STRICT_JUDGE_PREFIX = """你是一个严格的阅卷专家，请根据标准答案判阅学生的答案。
 
 判阅标准：
 1. 答案必须与标准答案高度一致才能给满分
 2. 部分正确可以给予部分分数
 3. 答案完全错误或无关则给0分
-
-请以JSON格式返回结果，格式如下：
-{{"score": 实际得分, "comment": "评语"}}
-"""
+""" + _COMMON_RULES
 
     # 宽松判卷提示词
-    LENIENT_JUDGE_TEMPLATE = """你是一个宽容的阅卷专家，请根据以下信息判阅学生的答案。
-
-题目：{question}
-标准答案：{standard_answer}
-学生答案：{student_answer}
-满分：{max_points}
+    LENIENT_JUDGE_PREFIX = """你是一个宽容的阅卷专家，请根据标准答案判阅学生的答案。
 
 判阅标准：
 1. 只要学生答案包含标准答案的核心要点，就可以给高分
 2. 表达方式不同但意思正确的，应该给予认可
 3. 即使有小的错误，也可以给予大部分分数
+""" + _COMMON_RULES
 
-请以JSON格式返回结果，格式如下：
-{{"score": 实际得分, "comment": "评语"}}
-"""
+    # 完整模板（静态前缀 + 动态后缀）
+    DEFAULT_JUDGE_TEMPLATE = DEFAULT_JUDGE_PREFIX + JUDGE_SUFFIX
+    STRICT_JUDGE_TEMPLATE = STRICT_JUDGE_PREFIX + JUDGE_SUFFIX
+    LENIENT_JUDGE_TEMPLATE = LENIENT_JUDGE_PREFIX + JUDGE_SUFFIX
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def get_template(template_type: str = "default") -> str:
         """
         获取指定类型的提示词模板
@@ -71,12 +85,64 @@ class PromptTemplates:
         Returns:
             提示词模板字符串
         """
-        templates = {
-            "default": PromptTemplates.DEFAULT_JUDGE_TEMPLATE,
-            "strict": PromptTemplates.STRICT_JUDGE_TEMPLATE,
-            "lenient": PromptTemplates.LENIENT_JUDGE_TEMPLATE
-        }
-        return templates.get(template_type, PromptTemplates.DEFAULT_JUDGE_TEMPLATE)
+        return _TEMPLATES.get(template_type, PromptTemplates.DEFAULT_JUDGE_TEMPLATE)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def split_template(template: str) -> Tuple[str, str]:
+        """
+        将模板拆分为静态前缀和动态后缀
+
+        从第一行包含占位符的内容开始视为动态后缀，之前的内容为静态前缀。
+        结果按模板缓存，重复调用不会重新解析。
+
+        Args:
+            template: 模板字符串
+
+        Returns:
+            (静态前缀, 动态后缀)，前缀已还原转义的花括号，后缀仍为待格式化的模板
+        """
+        lines = template.splitlines(keepends=True)
+
+        for i, line in enumerate(lines):
+            if any(field is not None for _, field, _, _ in _FORMATTER.parse(line)):
+                break
+        else:
+            i = len(lines)
+
+        static_prefix = "".join(lines[:i]).format()
+        dynamic_suffix = "".join(lines[i:])
+        return static_prefix, dynamic_suffix
+
+    @staticmethod
+    def compile_template(template: str) -> Tuple[Tuple[str, Optional[str], Optional[str], Optional[str]], ...]:
+        """
+        预解析模板，供 render_template 重复使用
+
+        Args:
+            template: 模板字符串
+
+        Returns:
+            解析结果，每项为 (字面文本, 字段名, 格式说明, 转换标记)
+        """
+        return tuple(_parse_template(template))
+
+    @staticmethod
+    def render_template(
+        plan: Sequence[Tuple[str, Optional[str], Optional[str], Optional[str]]],
+        values: Dict[str, Any]
+    ) -> str:
+        """
+        按预解析结果生成提示词，等价于 template.format(**values)
+
+        Args:
+            plan: compile_template 的返回值
+            values: 格式化参数
+
+        Returns:
+            格式化后的提示词
+        """
+        return _render(plan, values)
 
     @staticmethod
     def format_template(template: str, **kwargs) -> str:
@@ -90,4 +156,43 @@ class PromptTemplates:
         Returns:
             格式化后的提示词
         """
-        return template.format(**kwargs)
+        return _render(_parse_template(template), kwargs)
+
+
+# 模板类型到模板的映射
+_TEMPLATES = {
+    "default": PromptTemplates.DEFAULT_JUDGE_TEMPLATE,
+    "strict": PromptTemplates.STRICT_JUDGE_TEMPLATE,
+    "lenient": PromptTemplates.LENIENT_JUDGE_TEMPLATE
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_template(template: str) -> List[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    """解析模板为 (字面文本, 字段名, 格式说明, 转换标记) 列表，结果按模板缓存"""
+    return list(_FORMATTER.parse(template))
+
+
+def _render(
+    plan: Sequence[Tuple[str, Optional[str], Optional[str], Optional[str]]],
+    kwargs: Dict[str, Any]
+) -> str:
+    """按解析结果拼接字符串，等价于 template.format_map(kwargs)（包括嵌套的格式说明）"""
+    parts = []
+    for literal, field_name, format_spec, conversion in plan:
+        parts.append(literal)
+        if field_name is None:
+            continue
+
+        if field_name in kwargs:
+            value = kwargs[field_name]
+        else:
+            value = _FORMATTER.get_field(field_name, (), kwargs)[0]
+        if conversion:
+            value = _FORMATTER.convert_field(value, conversion)
+        if format_spec and "{" in format_spec:
+            # 格式说明中嵌套了字段，如 {a:{width}}，先展开格式说明
+            format_spec = _render(_parse_template(format_spec), kwargs)
+        parts.append(format(value, format_spec or ""))
+
+    return "".join(parts)
@@ -4,15 +4,60 @@
 支持本地验证和远程服务器验证
 """
 import os
+import base64
+import functools
 import hashlib
+import hmac
 import json
+import struct
 import time
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def get_machine_id() -> str:
-    """获取机器唯一标识"""
+
+# 授权文件格式版本
+# v1: 机器标识使用 MD5(主机名 + MAC)
+# v2: 机器标识使用 BLAKE2b(主机名 + MAC)
+LICENSE_FILE_VERSION = 2
+
+# 授权码版本前缀（与 tools/license_generator.py 一致）
+LICENSE_PREFIX = "GS2-"
+LEGACY_LICENSE_PREFIX = "GS1-"
+
+# GS2 数据布局：签发时间(u32) + 到期时间(u32) + 授权类型(u8) + 用户ID长度(u8) + 用户ID，之后为 16 字节签名
+_PAYLOAD_HEADER = struct.Struct("<IIBB")
+_SIGNATURE_SIZE = 16
+# GS2 使用 URL 安全的 Base64（- 和 _），解码时拒绝非法字符
+_b64decode = functools.partial(base64.b64decode, altchars=b"-_", validate=True)
+# GS2 授权码的最短长度（前缀 + 空用户ID时数据和签名的 Base64 长度），更短的直接拒绝
+_MIN_CODE_LENGTH = len(LICENSE_PREFIX) + (_PAYLOAD_HEADER.size + _SIGNATURE_SIZE + 2) // 3 * 4
+_LICENSE_TYPE_NAMES = {0: "standard", 1: "pro", 2: "enterprise"}
+
+# 每天的秒数
+_SEC_PER_DAY = 86400
+
+
+def _unix_time() -> int:
+    """当前 Unix 时间（整数秒）"""
+    return time.time_ns() // 1_000_000_000
+
+
+@functools.lru_cache(maxsize=2)
+def get_machine_id(version: int = LICENSE_FILE_VERSION) -> str:
+    """
+    获取机器唯一标识（进程内只计算一次）
+
+    Args:
+        version: 授权文件格式版本，旧版本授权文件使用旧的计算方式
+
+    Returns:
+        机器标识字符串
+    """
     import platform
     import uuid
 
@@ -20,9 +65,9 @@ def get_machine_id() -> str:
     if system == "Windows":
         try:
             import winreg
-            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
-                                r"SOFTWARE\Microsoft\Cryptography")
-            machine_guid, _ = winreg.QueryValueEx(key, "MachineGuid")
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                                r"SOFTWARE\Microsoft\Cryptography") as key:
+                machine_guid, _ = winreg.QueryValueEx(key, "MachineGuid")
             return str(machine_guid)
         except:
             pass
@@ -31,7 +76,23 @@ def get_machine_id() -> str:
     hostname = platform.node()
     mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff)
                      for elements in range(0, 8*6, 8)][::-1])
-    return hashlib.md5(f"{hostname}{mac}".encode()).hexdigest()
+    raw = f"{hostname}{mac}".encode()
+    if version < 2:
+        return hashlib.md5(raw).hexdigest()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_http_session():
+    """获取复用连接的 HTTP 会话（远程验证时才导入 requests）"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class LicenseManager:
@@ -57,6 +118,9 @@ class LicenseManager:
 
         # 密钥（与 license_generator.py 使用相同的密钥）
         self.secret_key = secret_key or "default-secret-key-change-this"
+        self._secret_key_bytes = self.secret_key.encode()
+        # 预先完成密钥填充的 HMAC 状态，每次验证复制后使用
+        self._hmac_proto = hmac.new(self._secret_key_bytes, None, hashlib.sha256)
 
     def _get_app_data_dir(self) -> str:
         """获取应用数据目录"""
@@ -98,54 +162,100 @@ class LicenseManager:
     def _verify_local(self, license_code: str) -> bool:
         """本地验证授权码"""
         try:
-            # 使用与 license_generator.py 相同的密钥进行验证
-            import base64
-
-            # 解码授权码
-            if not license_code.startswith("GS1-"):
-                return False
-
-            parts = license_code[4:].split("-")
-            if len(parts) != 2:
+            data_bytes, signature, legacy = self._decode_license_code(license_code)
+
+            # 针对收到的原始字节验证签名（使用与 license_generator.py 相同的密钥）
+            if legacy:
+                expected_signature = hashlib.sha256(
+                    data_bytes + self._secret_key_bytes
+                ).hexdigest()[:16]
+            else:
+                h = self._hmac_proto.copy()
+                h.update(data_bytes)
+                expected_signature = h.digest()[:_SIGNATURE_SIZE]
+
+            if not hmac.compare_digest(expected_signature, signature):
                 return False
 
-            encoded, checksum = parts
+            data = self._parse_license_data(data_bytes, legacy)
 
-            # 验证校验位
-            if checksum != hashlib.md5(encoded.encode()).hexdigest()[:4]:
+            # 检查有效期
+            if _unix_time() > data.get("expiry", 0):
                 return False
 
-            # Base64 解码
-            decoded = base64.b64decode(encoded).decode()
+            return True
 
-            # 分离数据和签名
-            data_str, signature = decoded.rsplit(".", 1)
-            data = json.loads(data_str)
+        except Exception:
+            return False
 
-            # 验证签名
-            data_str_sorted = json.dumps(data, sort_keys=True)
-            expected_signature = hashlib.sha256(
-                f"{data_str_sorted}{self.secret_key}".encode()
-            ).hexdigest()[:16]
+    def _decode_license_code(self, license_code: str) -> tuple:
+        """
+        解码授权码（格式与 tools/license_generator.py 一致）
 
-            if signature != expected_signature:
-                return False
+        Args:
+            license_code: 授权码
 
-            # 检查有效期
-            if time.time() > data.get("expiry", 0):
-                return False
+        Returns:
+            (授权数据的原始字节, 签名, 是否为旧版授权码)
+        """
+        if license_code.startswith(LICENSE_PREFIX):
+            # 先按长度排除，避免对明显错误的输入做 Base64 解码
+            if len(license_code) < _MIN_CODE_LENGTH:
+                raise ValueError("授权码长度错误")
+            decoded = _b64decode(license_code[len(LICENSE_PREFIX):])
+            return decoded[:-_SIGNATURE_SIZE], decoded[-_SIGNATURE_SIZE:], False
+
+        if not license_code.startswith(LEGACY_LICENSE_PREFIX):
+            raise ValueError("无效的授权码格式")
+
+        # 旧版授权码：分离并验证校验位
+        parts = license_code[len(LEGACY_LICENSE_PREFIX):].split("-")
+        if len(parts) != 2:
+            raise ValueError("授权码格式错误")
+
+        # 旧版校验位必须沿用 MD5 才能验证已发放的授权码，长度不对时无需计算
+        encoded, checksum = parts
+        if len(checksum) != 4 or checksum != hashlib.md5(encoded.encode()).hexdigest()[:4]:
+            raise ValueError("校验位验证失败")
+
+        # Base64 解码，分离 JSON 数据和十六进制签名
+        decoded = base64.b64decode(encoded)
+        data_bytes, signature = decoded.rsplit(b".", 1)
+        return data_bytes, signature.decode(), True
+
+    @staticmethod
+    def _parse_license_data(data_bytes: bytes, legacy: bool) -> Dict[str, Any]:
+        """
+        解析授权数据
 
-            return True
+        Args:
+            data_bytes: _decode_license_code 返回的原始字节
+            legacy: 是否为旧版（JSON）授权码
 
-        except Exception:
-            return False
+        Returns:
+            授权数据字典
+        """
+        if legacy:
+            if orjson is not None:
+                return orjson.loads(data_bytes)
+            return json.loads(data_bytes)
+
+        issued_at, expiry, type_code, user_id_len = _PAYLOAD_HEADER.unpack_from(data_bytes)
+        user_id_bytes = data_bytes[_PAYLOAD_HEADER.size:]
+        if len(user_id_bytes) != user_id_len:
+            raise ValueError("授权数据长度错误")
+
+        return {
+            "user_id": user_id_bytes.decode(),
+            "issued_at": issued_at,
+            "expiry": expiry,
+            "license_type": _LICENSE_TYPE_NAMES.get(type_code, "")
+        }
 
     def _verify_remote(self, license_code: str) -> bool:
         """远程服务器验证"""
         try:
-            import requests
-
-            response = requests.post(
+            response = _get_http_session().post(
                 self.server_url + "/verify",
                 json={"license_code": license_code},
                 timeout=10
@@ -172,16 +282,17 @@ class LicenseManager:
         try:
             license_data = self._load_license_data()
 
-            # 检查机器ID是否匹配
-            if license_data.get("machine_id") != get_machine_id():
+            # 检查机器ID是否匹配（按授权文件版本计算）
+            version = license_data.get("v", 1)
+            if license_data.get("machine_id") != get_machine_id(version):
                 return False
 
             # 检查有效期
             timestamp = license_data.get("timestamp", 0)
             valid_days = license_data.get("valid_days", self.valid_days)
-            valid_until = timestamp + (valid_days * 24 * 60 * 60)
+            valid_until = timestamp + valid_days * _SEC_PER_DAY
 
-            if time.time() > valid_until:
+            if _unix_time() > valid_until:
                 return False
 
             return True
@@ -204,25 +315,18 @@ class LicenseManager:
 
         # 解析授权码获取详细信息
         try:
-            import base64
-
-            if not license_code.startswith("GS1-"):
-                raise ValueError("无效的授权码格式")
-
-            parts = license_code[4:].split("-")
-            encoded = parts[0]
-            decoded = base64.b64decode(encoded).decode()
-            data_str, signature = decoded.rsplit(".", 1)
-            data = json.loads(data_str)
+            data_bytes, _, legacy = self._decode_license_code(license_code)
+            data = self._parse_license_data(data_bytes, legacy)
 
             # 计算过期时间戳
-            expiry = data.get("expiry", int(time.time()))
+            expiry = data.get("expiry", _unix_time())
 
             license_data = {
+                "v": LICENSE_FILE_VERSION,
                 "license_code": license_code,
                 "user_id": data.get("user_id", ""),
                 "license_type": data.get("license_type", ""),
-                "timestamp": int(time.time()),
+                "timestamp": _unix_time(),
                 "machine_id": get_machine_id(),
                 "valid_days": self.valid_days
             }
@@ -233,8 +337,9 @@ class LicenseManager:
         except Exception:
             # 解析失败，使用原始保存方式
             license_data = {
+                "v": LICENSE_FILE_VERSION,
                 "license_code": license_code,
-                "timestamp": int(time.time()),
+                "timestamp": _unix_time(),
                 "machine_id": get_machine_id(),
                 "valid_days": self.valid_days
             }
@@ -256,7 +361,7 @@ class LicenseManager:
             timestamp = license_data.get("timestamp", 0)
             valid_days = license_data.get("valid_days", self.valid_days)
             valid_until = datetime.fromtimestamp(
-                timestamp + (valid_days * 24 * 60 * 60)
+                timestamp + valid_days * _SEC_PER_DAY
             )
             days_left = (valid_until - datetime.now()).days
 
@@ -272,13 +377,20 @@ class LicenseManager:
 
     def _load_license_data(self) -> Dict[str, Any]:
         """加载授权数据"""
-        with open(self.license_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(self.license_file, 'rb') as f:
+            content = f.read()
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
 
     def _save_license_data(self, data: Dict[str, Any]) -> None:
         """保存授权数据"""
-        with open(self.license_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        with open(self.license_file, 'wb') as f:
+            f.write(content)
 
     def clear_license(self) -> bool:
         """
@@ -4,46 +4,177 @@
 负责启动/关闭浏览器、页面导航、元素等待
 """
 import asyncio
-from typing import Dict, Any, Optional
+import functools
+from importlib.util import find_spec
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Any, List, Optional, Tuple
 import logging
 
-try:
-    from playwright.async_api import async_playwright, Browser, Page, BrowserType
-except ImportError:
-    async_playwright = None
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
 
 logger = logging.getLogger(__name__)
 
+# block_assets 开启时默认拦截的资源类型
+_BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+
+# 在页面内用 MutationObserver 等待选择器匹配，超时返回 false
+_WAIT_FOR_SELECTOR_JS = """([sel, timeout]) => new Promise(resolve => {
+    if (document.querySelector(sel)) return resolve(true);
+    const observer = new MutationObserver(() => {
+        if (document.querySelector(sel)) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(true);
+        }
+    });
+    const timer = setTimeout(() => { observer.disconnect(); resolve(false); }, timeout);
+    observer.observe(document, {subtree: true, childList: true, attributes: true});
+})"""
+
+# 标记当前元素并监听其 load 事件，返回比较用的属性值
+_MARK_ELEMENT_JS = """([sel, attr]) => {
+    const el = document.querySelector(sel);
+    if (!el) return null;
+    el.__sz_marked = true;
+    el.__sz_loaded = false;
+    el.addEventListener('load', () => { el.__sz_loaded = true; }, {once: true});
+    return el.getAttribute(attr);
+}"""
+
+# 元素被替换（或页面重新加载）、属性值变化、或触发了 load 事件时视为已变化
+_ELEMENT_CHANGED_JS = """([sel, attr, prev]) => {
+    const el = document.querySelector(sel);
+    return !!el && (!el.__sz_marked || el.__sz_loaded || el.getAttribute(attr) !== prev);
+}"""
+
+# 在页面内一次性为多个输入框赋值并触发 input/change 事件，返回未找到的选择器；
+# 既作为预装的 window.__sz_fill_batch，也供 FormFiller 在未预装时直接执行
+FILL_BATCH_JS = """items => {
+    const missing = [];
+    for (const [sel, val] of items) {
+        const el = document.querySelector(sel);
+        if (!el) { missing.push(sel); continue; }
+        el.focus();
+        el.value = val;
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    return missing;
+}"""
+
+# 页面辅助函数，页面每次加载时预先安装，FormFiller 直接调用，
+# 避免每次提交/批量填写都向浏览器发送并编译一段脚本
+PAGE_HELPERS_SCRIPT = f"""
+window.__sz_submit = sel => document.querySelector(sel).submit();
+window.__sz_fill_batch = {FILL_BATCH_JS};
+"""
 
-class BrowserController:
-    """浏览器控制器"""
 
-    def __init__(self, config: Dict[str, Any]):
+@functools.lru_cache(maxsize=1)
+def playwright_errors() -> Tuple[type, type]:
+    """
+    Playwright 的异常类型（首次使用时导入，之后直接返回）
+
+    Returns:
+        (playwright Error, playwright TimeoutError)
+    """
+    from playwright.async_api import Error, TimeoutError
+    return Error, TimeoutError
+
+
+class _BrowserConfig:
+    """BrowserController 和 BrowserPool 共用的配置解析与请求拦截"""
+
+    def _load_config(self, config: Dict[str, Any]) -> None:
         """
-        初始化浏览器控制器
+        解析浏览器配置
 
         Args:
             config: 浏览器配置字典
         """
-        if async_playwright is None:
+        # 仅检查是否安装，playwright 在启动浏览器时才导入
+        if find_spec("playwright") is None:
             raise ImportError("请先安装 playwright: pip install playwright")
 
         self.browser_config = config.get("browser", {})
         self.headless = self.browser_config.get("headless", False)
         self.viewport = self.browser_config.get("viewport", {"width": 1920, "height": 1080})
         self.default_timeout = self.browser_config.get("timeout", 30000)
+        self.block_assets = self.browser_config.get("block_assets", False)
+        self.blocked_resource_types = frozenset(
+            self.browser_config.get("blocked_resource_types", _BLOCKED_RESOURCE_TYPES)
+        )
+        # 拦截的域名（含子域名），如统计、广告域名，与 block_assets 无关
+        self.block_hosts = tuple(
+            host.lower().lstrip(".") for host in self.browser_config.get("block_hosts") or ()
+        )
+        self._block_host_suffixes = tuple("." + host for host in self.block_hosts)
+
+    @property
+    def filters_requests(self) -> bool:
+        """是否需要安装请求拦截"""
+        return bool(self.block_assets or self.block_hosts)
+
+    async def _filter_route(self, route) -> None:
+        """拦截配置的静态资源类型以及 block_hosts 中域名的请求"""
+        request = route.request
+        if self.block_assets and request.resource_type in self.blocked_resource_types:
+            await route.abort()
+        elif self.block_hosts and self._is_blocked_host(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _is_blocked_host(self, url: str) -> bool:
+        """
+        判断 URL 的域名是否在 block_hosts 中（含子域名）
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            是否需要拦截
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        return host in self.block_hosts or host.endswith(self._block_host_suffixes)
+
+
+class BrowserController(_BrowserConfig):
+    """浏览器控制器"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化浏览器控制器
+
+        Args:
+            config: 浏览器配置字典
+        """
+        self._load_config(config)
 
         self._playwright: Optional[Any] = None
-        self._browser: Optional[Browser] = None
-        self._page: Optional[Page] = None
+        self._browser: Optional["Browser"] = None
+        self._page: Optional["Page"] = None
+        self._pool: Optional["BrowserPool"] = None
 
-    async def start(self) -> Page:
+    async def start(self, pool: Optional["BrowserPool"] = None) -> "Page":
         """
         启动浏览器
 
+        Args:
+            pool: 浏览器池（指定时从池中借用已预热的页面，不再单独启动浏览器）
+
         Returns:
             浏览器页面对象
         """
+        if pool is not None:
+            self._pool = pool
+            self._page = await pool.acquire()
+            logger.info("已从浏览器池获取页面")
+            return self._page
+
+        from playwright.async_api import async_playwright
+
         self._playwright = await async_playwright().start()
 
         # 启动浏览器（使用 chromium）
@@ -59,23 +190,45 @@ class BrowserController:
         # 设置默认超时
         self._page.set_default_timeout(self.default_timeout)
 
+        # 安装页面辅助函数（之后每次导航都会自动注入）
+        await self._page.add_init_script(PAGE_HELPERS_SCRIPT)
+
+        # 拦截不需要的静态资源和域名
+        if self.filters_requests:
+            await self._page.route("**/*", self._filter_route)
+
         logger.info("浏览器启动成功")
         return self._page
 
-    async def navigate(self, url: str, wait_until: str = "networkidle") -> None:
+    async def navigate(self, url: str, wait_until: str = "domcontentloaded") -> None:
         """
         导航到指定 URL
 
+        默认只等待 DOM 加载完成；networkidle 会被统计、心跳等请求拖慢数秒，
+        需要等待具体元素时请配合 wait_for_element 或使用 goto_ready。
+
         Args:
             url: 目标 URL
-            wait_until: 等待条件 (load/domcontentloaded/networkidle)
+            wait_until: 等待条件 (commit/load/domcontentloaded/networkidle)
         """
         if not self._page:
             raise RuntimeError("浏览器未启动，请先调用 start()")
 
-        logger.info(f"导航到: {url}")
+        logger.info("导航到: %s", url)
         await self._page.goto(url, wait_until=wait_until)
 
+    async def goto_ready(self, url: str, ready_selector: str, timeout: int = None) -> None:
+        """
+        导航到指定 URL，并在目标元素出现后立即返回
+
+        Args:
+            url: 目标 URL
+            ready_selector: 表示页面可用的元素选择器
+            timeout: 等待元素的超时时间（毫秒）
+        """
+        await self.navigate(url, wait_until="commit")
+        await self.wait_for_element_fast(ready_selector, timeout=timeout)
+
     async def wait_for_element(
         self,
         selector: str,
@@ -92,9 +245,130 @@ class BrowserController:
             raise RuntimeError("浏览器未启动")
 
         timeout = timeout or self.default_timeout
-        logger.debug(f"等待元素: {selector}")
+        logger.debug("等待元素: %s", selector)
         await self._page.wait_for_selector(selector, timeout=timeout)
 
+    async def wait_for_element_fast(
+        self,
+        selector: str,
+        timeout: int = None
+    ) -> None:
+        """
+        等待元素出现（基于 MutationObserver，元素插入 DOM 后立即返回）
+
+        与 wait_for_element 不同，只要求元素存在于 DOM 中，不要求可见。
+        页面导航导致脚本上下文失效时回退到 wait_for_element。
+
+        Args:
+            selector: CSS 选择器
+            timeout: 超时时间（毫秒）
+        """
+        if not self._page:
+            raise RuntimeError("浏览器未启动")
+
+        PlaywrightError, PlaywrightTimeoutError = playwright_errors()
+
+        timeout = timeout or self.default_timeout
+        logger.debug("等待元素: %s", selector)
+        try:
+            found = await self._page.evaluate(_WAIT_FOR_SELECTOR_JS, [selector, timeout])
+        except PlaywrightError:
+            await self.wait_for_element(selector, timeout=timeout)
+            return
+
+        if not found:
+            raise PlaywrightTimeoutError(f"等待元素超时（{timeout}ms）: {selector}")
+
+    async def wait_for_enabled(
+        self,
+        selector: str,
+        timeout: int = None
+    ) -> bool:
+        """
+        等待元素出现且处于可用状态（未被 disabled）
+
+        Args:
+            selector: CSS 选择器
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            是否在超时前变为可用
+        """
+        if not self._page:
+            raise RuntimeError("浏览器未启动")
+
+        _, PlaywrightTimeoutError = playwright_errors()
+
+        timeout = timeout or self.default_timeout
+        logger.debug("等待元素可用: %s", selector)
+        try:
+            await self._page.wait_for_function(
+                "sel => { const el = document.querySelector(sel); return !!el && !el.disabled; }",
+                arg=selector,
+                timeout=timeout
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def mark_element(self, selector: str, attribute: str = "src") -> Optional[str]:
+        """
+        标记当前匹配的元素并返回其属性值，供 wait_for_element_change 判断元素是否已切换
+
+        Args:
+            selector: CSS 选择器
+            attribute: 用于比较的属性名
+
+        Returns:
+            属性值，元素或属性不存在时为 None
+        """
+        if not self._page:
+            raise RuntimeError("浏览器未启动")
+
+        return await self._page.evaluate(_MARK_ELEMENT_JS, [selector, attribute])
+
+    async def wait_for_element_change(
+        self,
+        selector: str,
+        previous: Optional[str],
+        attribute: str = "src",
+        timeout: int = None
+    ) -> bool:
+        """
+        等待 mark_element 标记过的元素发生变化
+
+        元素被替换、页面重新加载、属性值不同于 previous，或元素触发了 load 事件，
+        都视为已变化。
+
+        Args:
+            selector: CSS 选择器
+            previous: mark_element 返回的属性值
+            attribute: 用于比较的属性名
+            timeout: 超时时间（毫秒）
+
+        Returns:
+            是否在超时前发生变化
+        """
+        if not self._page:
+            raise RuntimeError("浏览器未启动")
+
+        PlaywrightError, PlaywrightTimeoutError = playwright_errors()
+
+        timeout = timeout or self.default_timeout
+        logger.debug("等待元素变化: %s", selector)
+        try:
+            await self._page.wait_for_function(
+                _ELEMENT_CHANGED_JS,
+                arg=[selector, attribute, previous],
+                timeout=timeout
+            )
+        except PlaywrightTimeoutError:
+            return False
+        except PlaywrightError:
+            # 等待期间页面跳转导致脚本上下文失效，说明已经切换到新页面
+            pass
+        return True
+
     async def wait_for_navigation(self, timeout: int = None) -> None:
         """
         等待页面导航完成
@@ -123,7 +397,7 @@ class BrowserController:
 
         return await self._page.evaluate(script)
 
-    async def get_page(self) -> Page:
+    async def get_page(self) -> "Page":
         """
         获取当前页面对象
 
@@ -137,6 +411,13 @@ class BrowserController:
 
     async def close(self) -> None:
         """关闭浏览器"""
+        if self._pool:
+            # 页面归还给浏览器池，由池负责关闭浏览器
+            self._pool.release(self._page)
+            self._pool = None
+            self._page = None
+            return
+
         if self._browser:
             await self._browser.close()
             self._browser = None
@@ -154,4 +435,118 @@ class BrowserController:
         Returns:
             是否已启动
         """
-        return self._browser is not None
+        return self._page is not None
+
+
+class BrowserPool(_BrowserConfig):
+    """浏览器上下文池：一个浏览器进程内预热多个独立上下文，供并发任务复用"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化浏览器池
+
+        Args:
+            config: 浏览器配置字典
+        """
+        self._load_config(config)
+
+        self._playwright: Optional[Any] = None
+        self._browser: Optional["Browser"] = None
+        self._contexts: List["BrowserContext"] = []
+        self._idle: Optional[asyncio.Queue] = None
+
+    @property
+    def size(self) -> int:
+        """池中上下文数量"""
+        return len(self._contexts)
+
+    async def start(self, size: int = 4) -> None:
+        """
+        启动浏览器并预热上下文
+
+        Args:
+            size: 上下文数量
+        """
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless
+        )
+
+        self._idle = asyncio.Queue()
+        for _ in range(size):
+            context = await self._browser.new_context(viewport=self.viewport)
+            context.set_default_timeout(self.default_timeout)
+            await context.add_init_script(PAGE_HELPERS_SCRIPT)
+            if self.filters_requests:
+                await context.route("**/*", self._filter_route)
+            self._contexts.append(context)
+            self._idle.put_nowait(await context.new_page())
+
+        logger.info("浏览器池启动成功，上下文数: %s", size)
+
+    async def acquire(self) -> "Page":
+        """
+        借用一个空闲页面（没有空闲页面时等待）
+
+        Returns:
+            页面对象
+        """
+        if self._idle is None:
+            raise RuntimeError("浏览器池未启动，请先调用 start()")
+
+        return await self._idle.get()
+
+    def release(self, page: "Page") -> None:
+        """
+        归还页面
+
+        Args:
+            page: 借用的页面对象
+        """
+        self._idle.put_nowait(page)
+
+    async def navigate_many(
+        self,
+        urls: List[str],
+        handler: Callable[["Page"], Awaitable[Any]],
+        wait_until: str = "domcontentloaded"
+    ) -> List[Any]:
+        """
+        并发打开多个 URL 并分别处理，并发数受池大小限制
+
+        Args:
+            urls: URL 列表
+            handler: 页面加载后的处理函数（协程），参数为页面对象
+            wait_until: 等待条件 (commit/domcontentloaded/load/networkidle)
+
+        Returns:
+            各 URL 的处理结果，顺序与 urls 一致
+        """
+        async def visit(url: str) -> Any:
+            page = await self.acquire()
+            try:
+                logger.info("导航到: %s", url)
+                await page.goto(url, wait_until=wait_until)
+                return await handler(page)
+            finally:
+                self.release(page)
+
+        return await asyncio.gather(*[visit(url) for url in urls])
+
+    async def close(self) -> None:
+        """关闭所有上下文和浏览器"""
+        for context in self._contexts:
+            await context.close()
+        self._contexts = []
+        self._idle = None
+
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+            logger.info("浏览器池已关闭")
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
@@ -3,54 +3,116 @@
 
 负责填写表单字段、点击按钮、触发提交
 """
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import logging
 
-try:
-    from playwright.async_api import Page
-except ImportError:
-    Page = None
+from src.automation.browser_controller import FILL_BATCH_JS
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator, Page
 
 logger = logging.getLogger(__name__)
 
+# 调用 BrowserController 预装的页面辅助函数；未安装时返回 null，由调用方回退
+_CALL_FILL_BATCH_JS = "items => window.__sz_fill_batch ? window.__sz_fill_batch(items) : null"
+_CALL_SUBMIT_JS = "sel => window.__sz_submit ? (window.__sz_submit(sel), true) : false"
+
+# 直接为单个输入框赋值并触发 input/change 事件，返回是否找到元素
+_FILL_RAW_JS = """([sel, val]) => {
+    const el = document.querySelector(sel);
+    if (!el) return false;
+    el.value = val;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return true;
+}"""
+
 
 class FormFiller:
     """表单填写工具类"""
 
-    def __init__(self, page: Page):
+    def __init__(self, page: "Page"):
         """
         初始化表单填写工具
 
         Args:
             page: Playwright 页面对象
         """
-        if Page is None:
-            raise ImportError("请先安装 playwright: pip install playwright")
-
         self.page = page
+        self._locators: Dict[str, "Locator"] = {}
+
+    def locator_for(self, selector: str) -> "Locator":
+        """
+        获取选择器对应的定位器（按选择器缓存）
+
+        定位器在每次操作时才查询元素，页面刷新后仍然有效。
+        取第一个匹配元素，与 page.fill/page.click 的行为一致。
+
+        Args:
+            selector: CSS 选择器
+
+        Returns:
+            定位器对象
+        """
+        locator = self._locators.get(selector)
+        if locator is None:
+            locator = self._locators[selector] = self.page.locator(selector).first
+        return locator
 
-    async def fill_input(self, selector: str, value: str, delay: int = 100) -> None:
+    async def fill_input(self, selector: str, value: str) -> None:
         """
         填写输入框
 
+        需要逐字输入时请使用 type_input。
+
         Args:
             selector: 输入框的 CSS 选择器
             value: 要填写的值
-            delay: 每次输入的延迟（毫秒），模拟人工输入
         """
-        logger.debug(f"填写输入框 {selector}: {value}")
-        await self.page.fill(selector, str(value), delay=delay)
+        logger.debug("填写输入框 %s: %s", selector, value)
+        await self.locator_for(selector).fill(str(value))
 
-    async def type_input(self, selector: str, text: str, delay: int = 50) -> None:
+    async def fill_input_raw(self, selector: str, value: str) -> None:
+        """
+        在页面内直接为输入框赋值
+
+        跳过 Playwright 的可操作性检查（可见、可编辑等），只做一次页面调用，
+        适用于普通输入框；依赖键盘事件的输入框请使用 fill_input。
+
+        Args:
+            selector: 输入框的 CSS 选择器
+            value: 要填写的值
+        """
+        logger.debug("直接赋值输入框 %s: %s", selector, value)
+        found = await self.page.evaluate(_FILL_RAW_JS, [selector, str(value)])
+        if not found:
+            raise ValueError(f"未找到输入框: {selector}")
+
+    async def fill_batch(self, fields: Dict[str, str]) -> None:
+        """
+        一次页面调用填写多个输入框
+
+        Args:
+            fields: {CSS 选择器: 值} 字典
+        """
+        logger.debug("批量填写 %s 个输入框", len(fields))
+        items = [[selector, str(value)] for selector, value in fields.items()]
+        missing = await self.page.evaluate(_CALL_FILL_BATCH_JS, items)
+        if missing is None:
+            missing = await self.page.evaluate(FILL_BATCH_JS, items)
+        if missing:
+            raise ValueError(f"未找到输入框: {', '.join(missing)}")
+
+    async def type_input(self, selector: str, text: str, delay: int = 0) -> None:
         """
         模拟键盘输入
 
         Args:
             selector: 输入框的 CSS 选择器
             text: 要输入的文本
-            delay: 每次按键的延迟（毫秒）
+            delay: 每次按键的延迟（毫秒），仅在网站限制按键速率（反自动化）时设为非 0
         """
-        logger.debug(f"键盘输入 {selector}: {text}")
+        logger.debug("键盘输入 %s: %s", selector, text)
         await self.page.type(selector, text, delay=delay)
 
     async def clear_input(self, selector: str) -> None:
@@ -60,7 +122,7 @@ class FormFiller:
         Args:
             selector: 输入框的 CSS 选择器
         """
-        logger.debug(f"清空输入框 {selector}")
+        logger.debug("清空输入框 %s", selector)
         await self.page.fill(selector, "")
 
     async def click_button(self, selector: str) -> None:
@@ -70,8 +132,8 @@ class FormFiller:
         Args:
             selector: 按钮的 CSS 选择器
         """
-        logger.debug(f"点击按钮 {selector}")
-        await self.page.click(selector)
+        logger.debug("点击按钮 %s", selector)
+        await self.locator_for(selector).click()
 
     async def submit_form(self, selector: str = "form") -> None:
         """
@@ -80,8 +142,9 @@ class FormFiller:
         Args:
             selector: 表单的 CSS 选择器
         """
-        logger.debug(f"提交表单 {selector}")
-        await self.page.locator(selector).evaluate("form => form.submit()")
+        logger.debug("提交表单 %s", selector)
+        if not await self.page.evaluate(_CALL_SUBMIT_JS, selector):
+            await self.page.locator(selector).evaluate("form => form.submit()")
 
     async def select_option(
         self,
@@ -99,7 +162,7 @@ class FormFiller:
             label: 选项标签
             index: 选项索引
         """
-        logger.debug(f"选择下拉框 {selector}: value={value}, label={label}, index={index}")
+        logger.debug("选择下拉框 %s: value=%s, label=%s, index=%s", selector, value, label, index)
         await self.page.select_option(selector, value=value, label=label, index=index)
 
     async def check_checkbox(self, selector: str, checked: bool = True) -> None:
@@ -110,7 +173,7 @@ class FormFiller:
             selector: 复选框的 CSS 选择器
             checked: 是否选中
         """
-        logger.debug(f"设置复选框 {selector}: checked={checked}")
+        logger.debug("设置复选框 %s: checked=%s", selector, checked)
         await self.page.set_checked(selector, checked)
 
     async def press_key(self, selector: str, key: str) -> None:
@@ -122,10 +185,10 @@ class FormFiller:
             key: 按键名称（如 Enter, Tab, Escape 等）
         """
         if selector:
-            await self.page.locator(selector).press(key)
+            await self.locator_for(selector).press(key)
         else:
             await self.page.keyboard.press(key)
-        logger.debug(f"按下按键: {key}")
+        logger.debug("按下按键: %s", key)
 
     async def submit_score(self, selector: str, score: float) -> None:
         """
@@ -137,4 +200,18 @@ class FormFiller:
         """
         await self.fill_input(selector, score)
         await self.press_key(selector, "Enter")
-        logger.info(f"已提交分数: {score}")
+        logger.info("已提交分数: %s", score)
+
+    async def submit_scores_batch(self, pairs: List[Tuple[str, float]]) -> None:
+        """
+        批量填写多个得分输入框，最后回车提交一次
+
+        Args:
+            pairs: (得分输入框的 CSS 选择器, 分数) 列表
+        """
+        if not pairs:
+            return
+
+        await self.fill_batch(dict(pairs))
+        await self.press_key(pairs[-1][0], "Enter")
+        logger.info("已批量提交 %s 个分数", len(pairs))
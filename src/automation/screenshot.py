@@ -4,14 +4,14 @@
 负责截取页面或元素的图片
 """
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 import logging
 
-try:
+from src.automation.browser_controller import playwright_errors
+
+if TYPE_CHECKING:
     from playwright.async_api import Page
-except ImportError:
-    Page = None
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +21,11 @@ class Screenshot:
 
     def __init__(
         self,
-        page: Page,
+        page: "Page",
         save_dir: str = "screenshots",
-        auto_save: bool = True
+        auto_save: bool = True,
+        image_format: str = "png",
+        jpeg_quality: int = 70
     ):
         """
         初始化截图工具
@@ -32,13 +34,14 @@ class Screenshot:
             page: Playwright 页面对象
             save_dir: 截图保存目录
             auto_save: 是否自动保存截图
+            image_format: 保存截图的默认格式 (png/jpeg)
+            jpeg_quality: JPEG 质量 (0-100)
         """
-        if Page is None:
-            raise ImportError("请先安装 playwright: pip install playwright")
-
         self.page = page
         self.save_dir = save_dir
         self.auto_save = auto_save
+        self.image_format = "jpeg" if image_format in ("jpg", "jpeg") else "png"
+        self.jpeg_quality = jpeg_quality
 
         # 确保保存目录存在
         if auto_save:
@@ -57,21 +60,26 @@ class Screenshot:
         screenshot = await self.page.screenshot(full_page=full_page)
         return screenshot
 
-    async def capture_element(self, selector: str) -> bytes:
+    async def capture_element(self, selector: str, timeout: int = None) -> bytes:
         """
-        截取指定元素
+        截取指定元素（会先等待元素可见）
 
         Args:
             selector: 元素的 CSS 选择器
+            timeout: 等待元素可见的超时时间（毫秒），默认使用页面超时
 
         Returns:
             截图数据（bytes）
         """
-        element = await self.page.query_selector(selector)
-        if not element:
+        _, PlaywrightTimeoutError = playwright_errors()
+
+        # Locator 截图自带可见性等待，只需解析一次选择器
+        locator = self.page.locator(selector).first
+        try:
+            screenshot = await locator.screenshot(type="png", timeout=timeout)
+        except PlaywrightTimeoutError:
             raise ValueError(f"未找到元素: {selector}")
 
-        screenshot = await element.screenshot()
         return screenshot
 
     async def capture_region(self, x: int, y: int, width: int, height: int) -> bytes:
@@ -111,21 +119,25 @@ class Screenshot:
         # 生成文件名
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
+            extension = "jpg" if self.image_format == "jpeg" else "png"
+            filename = f"screenshot_{timestamp}.{extension}"
 
         filepath = os.path.join(self.save_dir, filename)
 
+        # 通过 path 参数由 Playwright 写入文件，省去本模块自己的 open/write
+        options = {"path": filepath}
+        if filename.lower().endswith((".jpg", ".jpeg")):
+            options.update(type="jpeg", quality=self.jpeg_quality)
+        else:
+            options["type"] = "png"
+
         # 截图
         if selector:
-            screenshot = await self.capture_element(selector)
+            await self.page.locator(selector).first.screenshot(**options)
         else:
-            screenshot = await self.capture_page(full_page=full_page)
-
-        # 保存
-        with open(filepath, 'wb') as f:
-            f.write(screenshot)
+            await self.page.screenshot(full_page=full_page, **options)
 
-        logger.info(f"截图已保存: {filepath}")
+        logger.info("截图已保存: %s", filepath)
         return filepath
 
     def set_save_dir(self, dir: str):
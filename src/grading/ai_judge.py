@@ -3,7 +3,9 @@ AI 判卷模块
 
 负责构建判卷提示词、调用 AI、解析判卷结果
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
 import logging
 
 from src.ai.ai_client import AIClient
@@ -13,10 +15,19 @@ from src.ai.prompt_templates import PromptTemplates
 logger = logging.getLogger(__name__)
 
 
+def _has_score(result: Dict[str, Any]) -> bool:
+    """判卷回复是否包含分数（不含分数的回复不缓存）"""
+    return "score" in result
+
+
 class AIJudge:
     """AI 判卷器"""
 
-    def __init__(self, ai_client: AIClient, prompt_template: str = None):
+    def __init__(
+        self,
+        ai_client: AIClient,
+        prompt_template: str = None
+    ):
         """
         初始化 AI 判卷器
 
@@ -25,12 +36,61 @@ class AIJudge:
             prompt_template: 自定义提示词模板
         """
         self.ai_client = ai_client
-        self.prompt_template = prompt_template or PromptTemplates.get_template("default")
+        self.set_template(prompt_template or PromptTemplates.get_template("default"))
 
     def judge(
         self,
         question: Dict[str, Any],
         student_answer: str
+    ) -> Dict[str, Any]:
+        """
+        判阅一道题（同步接口，不能在事件循环内调用）
+
+        Args:
+            question: 题目字典，包含 text, answer, points 等字段
+            student_answer: 学生答案文本
+
+        Returns:
+            判卷结果字典，包含 score 和 comment
+        """
+        return self.ai_client.run_sync(self.judge_async(question, student_answer))
+
+    async def judge_batch(
+        self,
+        pairs: Sequence[Tuple[Dict[str, Any], str]],
+        concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        并发判阅多道题
+
+        Args:
+            pairs: (题目字典, 学生答案) 列表
+            concurrency: 最大并发判阅数
+
+        Returns:
+            判卷结果列表，顺序与 pairs 一致
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            self._judge_one(semaphore, question, student_answer)
+            for question, student_answer in pairs
+        ]
+        return await asyncio.gather(*tasks)
+
+    async def _judge_one(
+        self,
+        semaphore: asyncio.Semaphore,
+        question: Dict[str, Any],
+        student_answer: str
+    ) -> Dict[str, Any]:
+        """在并发限制下判阅一道题"""
+        async with semaphore:
+            return await self.judge_async(question, student_answer)
+
+    async def judge_async(
+        self,
+        question: Dict[str, Any],
+        student_answer: str
     ) -> Dict[str, Any]:
         """
         判阅一道题
@@ -42,12 +102,16 @@ class AIJudge:
         Returns:
             判卷结果字典，包含 score 和 comment
         """
-        prompt = self._build_prompt(question, student_answer)
+        messages = self._build_messages(question, student_answer)
 
         try:
-            result = self.ai_client.chat_json(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            # 相同题目和答案的请求内容相同，由 AI 客户端的响应缓存（内存 LRU + 磁盘）去重，
+            # 只有带分数的回复才写入缓存
+            result = await self.ai_client.chat_json(
+                messages=messages,
+                validator=_has_score,
+                temperature=0,
+                cache_key=f"{self._cache_key_prefix}-{question.get('id')}"
             )
             return self._parse_result(result, question["points"])
 
@@ -60,28 +124,59 @@ class AIJudge:
                 "question_id": question.get("id")
             }
 
-    def _build_prompt(
+    @staticmethod
+    def _template_values(
+        question: Dict[str, Any],
+        student_answer: str
+    ) -> Dict[str, Any]:
+        """
+        提取模板所需的字段值
+
+        Args:
+            question: 题目字典
+            student_answer: 学生答案
+
+        Returns:
+            模板格式化参数
+        """
+        return {
+            "question": question.get("text", ""),
+            "standard_answer": question.get("answer", ""),
+            "student_answer": student_answer,
+            "max_points": question.get("points", 10)
+        }
+
+    def _build_messages(
         self,
         question: Dict[str, Any],
         student_answer: str
-    ) -> str:
+    ) -> List[Dict[str, str]]:
         """
-        构建判卷提示词
+        构建判卷消息列表
+
+        静态前缀作为 system 消息，题目和答案作为 user 消息，
+        使所有判卷请求共享相同的前缀以命中服务商的提示词缓存。
 
         Args:
             question: 题目字典
             student_answer: 学生答案
 
         Returns:
-            格式化后的提示词
+            消息列表
         """
-        return self.prompt_template.format(
-            question=question.get("text", ""),
-            standard_answer=question.get("answer", ""),
-            student_answer=student_answer,
-            max_points=question.get("points", 10)
+        user_content = PromptTemplates.render_template(
+            self._suffix_plan,
+            self._template_values(question, student_answer)
         )
 
+        if not self._static_prefix:
+            return [{"role": "user", "content": user_content}]
+
+        return [
+            {"role": "system", "content": self._static_prefix},
+            {"role": "user", "content": user_content}
+        ]
+
     def _parse_result(
         self,
         result: Dict[str, Any],
@@ -122,6 +217,24 @@ class AIJudge:
             template: 新的提示词模板
         """
         self.prompt_template = template
+        self._static_prefix, self._dynamic_suffix = PromptTemplates.split_template(template)
+
+        # 预先解析模板，每次判卷只需拼接字符串
+        self._suffix_plan = PromptTemplates.compile_template(self._dynamic_suffix)
+
+        # 同一模板、同一题目的请求使用相同的缓存键，让服务商将其路由到同一缓存
+        digest = hashlib.sha256(self._static_prefix.encode()).hexdigest()[:16]
+        self._cache_key_prefix = f"grade-{digest}"
+
+    @property
+    def static_prefix(self) -> str:
+        """所有判卷请求共享的静态提示词前缀（作为 system 消息发送）"""
+        return self._static_prefix
+
+    @property
+    def dynamic_suffix(self) -> str:
+        """每道题不同的提示词后缀模板（作为 user 消息发送）"""
+        return self._dynamic_suffix
 
     def get_template(self) -> str:
         """
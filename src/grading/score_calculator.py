@@ -3,9 +3,17 @@
 
 负责累加各题得分、计算总分、生成评分报告
 """
+import functools
 from typing import List, Dict, Any
 
 
+@functools.lru_cache(maxsize=1)
+def _numpy():
+    """numpy 模块（首次计算总分时才导入，不拖慢程序启动）"""
+    import numpy
+    return numpy
+
+
 class ScoreCalculator:
     """评分计算器"""
 
@@ -21,6 +29,11 @@ class ScoreCalculator:
         self.passing_score = passing_score
         self.max_score = sum(q.get("points", 0) for q in questions)
 
+        # 预先提取报告需要的题目字段，避免每次生成报告时重复查找
+        self._ids = [q.get("id", i + 1) for i, q in enumerate(questions)]
+        self._texts = [q.get("text", "") for q in questions]
+        self._points = [q.get("points", 0) for q in questions]
+
     def calculate_total(self, judge_results: List[Dict[str, Any]]) -> float:
         """
         计算总分
@@ -31,7 +44,13 @@ class ScoreCalculator:
         Returns:
             总分
         """
-        return sum(result.get("score", 0) for result in judge_results)
+        np = _numpy()
+        scores = np.fromiter(
+            (result.get("score", 0) for result in judge_results),
+            dtype=np.float64,
+            count=len(judge_results)
+        )
+        return float(scores.sum())
 
     def generate_report(
         self,
@@ -49,15 +68,18 @@ class ScoreCalculator:
         total_score = self.calculate_total(judge_results)
 
         # 构建详细报告
-        details = []
-        for i, (question, result) in enumerate(zip(self.questions, judge_results)):
-            details.append({
-                "question_id": question.get("id", i + 1),
-                "question": question.get("text", ""),
-                "max_points": question.get("points", 0),
+        details = [
+            {
+                "question_id": question_id,
+                "question": text,
+                "max_points": points,
                 "score": result.get("score", 0),
                 "comment": result.get("comment", "")
-            })
+            }
+            for question_id, text, points, result in zip(
+                self._ids, self._texts, self._points, judge_results
+            )
+        ]
 
         report = {
             "total_score": total_score,
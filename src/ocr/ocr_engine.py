@@ -3,19 +3,43 @@ OCR 引擎模块
 
 封装 PaddleOCR 进行图片文字识别
 """
-from typing import List, Dict, Any, Optional
-import numpy as np
-from PIL import Image
+import functools
+import os
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
-try:
-    from paddleocr import PaddleOCR
-except ImportError:
-    PaddleOCR = None
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@functools.lru_cache(maxsize=1)
+def _numpy():
+    """numpy 模块（首次处理图片时才导入）"""
+    import numpy
+    return numpy
+
+
+@functools.lru_cache(maxsize=1)
+def _cv2():
+    """OpenCV 模块（首次解码图片时才导入）"""
+    import cv2
+    return cv2
+
+
+@functools.lru_cache(maxsize=1)
+def _pil_image():
+    """PIL.Image 模块（只有传入数组、字节和路径以外的图片时才导入）"""
+    from PIL import Image
+    return Image
 
 
 class OCREngine:
     """OCR 引擎封装类"""
 
+    # 已加载的 PaddleOCR 实例，按模型配置共享，避免重复加载模型
+    _instances: Dict[tuple, Any] = {}
+
     def __init__(self, config: Dict[str, Any] = None):
         """
         初始化 OCR 引擎
@@ -23,23 +47,50 @@ class OCREngine:
         Args:
             config: OCR 配置字典
         """
-        if PaddleOCR is None:
+        # 仅检查是否安装，PaddleOCR 在首次识别时才导入（导入耗时数秒）
+        if find_spec("paddleocr") is None:
             raise ImportError("请先安装 PaddleOCR: pip install paddleocr")
 
         self.config = config or {}
         self.use_gpu = self.config.get("use_gpu", False)
         self.lang = self.config.get("lang", "ch")
-        self._ocr: Optional[PaddleOCR] = None
+        # 方向分类需要额外跑一个模型，扫描试卷一般不会旋转，默认关闭
+        self.use_angle_cls = self.config.get("use_angle_cls", False)
+        # PaddleOCR 只在启用 TensorRT 时才使用半精度，因此 fp16 会同时开启 TensorRT（需 GPU 并安装 TensorRT）
+        self.precision = self.config.get("precision", "fp32")
+        self.use_tensorrt = self.use_gpu and self.precision == "fp16"
+        self.enable_mkldnn = self.config.get("enable_mkldnn", True)
+        self.cpu_threads = self.config.get("cpu_threads") or os.cpu_count() or 1
+        self._ocr: Optional[Any] = None
 
     def _init_ocr(self):
-        """延迟初始化 PaddleOCR"""
-        if self._ocr is None:
-            self._ocr = PaddleOCR(
-                use_angle_cls=True,
+        """延迟初始化 PaddleOCR，相同配置的引擎共用同一个实例"""
+        if self._ocr is not None:
+            return
+
+        key = (
+            self.lang,
+            self.use_gpu,
+            self.use_angle_cls,
+            self.precision,
+            self.enable_mkldnn,
+            self.cpu_threads
+        )
+        ocr = OCREngine._instances.get(key)
+        if ocr is None:
+            from paddleocr import PaddleOCR
+
+            ocr = OCREngine._instances.setdefault(key, PaddleOCR(
+                use_angle_cls=self.use_angle_cls,
                 lang=self.lang,
                 use_gpu=self.use_gpu,
+                precision=self.precision,
+                use_tensorrt=self.use_tensorrt,
+                enable_mkldnn=self.enable_mkldnn,
+                cpu_threads=self.cpu_threads,
                 show_log=False
-            )
+            ))
+        self._ocr = ocr
 
     def recognize(
         self,
@@ -50,7 +101,7 @@ class OCREngine:
         识别图片中的文字
 
         Args:
-            image: 图片对象，可以是 PIL.Image.Image 或 numpy 数组
+            image: 图片对象，可以是 PIL.Image.Image、numpy 数组、编码后的图片字节或图片文件路径
             return_details: 是否返回详细信息（包括坐标、置信度等）
 
         Returns:
@@ -59,35 +110,111 @@ class OCREngine:
         self._init_ocr()
 
         # 转换图片格式
-        if isinstance(image, Image.Image):
-            image = np.array(image)
+        image = self._to_array(image)
 
         # 执行 OCR
-        result = self._ocr.ocr(image, cls=True)
+        result = self._ocr.ocr(image, cls=self.use_angle_cls)
+
+        return self._format_result(result, return_details)
+
+    def recognize_batch(
+        self,
+        images: List[Any],
+        return_details: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        批量识别多张图片中的文字
+
+        Args:
+            images: 图片列表，每项可以是 PIL.Image.Image、numpy 数组、编码后的图片字节或图片文件路径
+            return_details: 是否返回详细信息（包括坐标、置信度等）
+
+        Returns:
+            与 images 一一对应的识别结果列表
+        """
+        self._init_ocr()
+
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(images)
+        for i, image in enumerate(images):
+            image = self._to_array(image)
+            # PaddleOCR 开启检测时不接受图片列表，逐张调用同一个已加载的实例
+            result = self._ocr.ocr(image, cls=self.use_angle_cls)
+            results[i] = self._format_result(result, return_details)
 
+        return results
+
+    def warm_up(self) -> None:
+        """加载模型并识别一张空白图片，使首张试卷不必承担初始化耗时"""
+        np = _numpy()
+        self.recognize(np.zeros((64, 256, 3), dtype=np.uint8))
+
+    @staticmethod
+    def _to_array(image) -> "np.ndarray":
+        """
+        将输入图片转换为 PaddleOCR 可直接使用的 numpy 数组
+
+        Args:
+            image: PIL.Image.Image、numpy 数组、编码后的图片字节或图片文件路径
+
+        Returns:
+            BGR 通道顺序的图片数组（numpy 数组原样返回）
+        """
+        np = _numpy()
+
+        # 已经是数组时直接使用，不再复制
+        if isinstance(image, np.ndarray):
+            return image
+
+        # 截图字节直接解码为 BGR 数组，省去 PIL 解码和一次整图拷贝
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            cv2 = _cv2()
+            array = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if array is None:
+                raise ValueError("图片数据解码失败")
+            return array
+
+        # 文件路径交给 OpenCV 解码（libjpeg-turbo/libpng，比 PIL 解码再转换更快）
+        if isinstance(image, (str, Path)):
+            cv2 = _cv2()
+            array = cv2.imread(str(image), cv2.IMREAD_COLOR)
+            if array is None:
+                raise ValueError(f"无法读取图片: {image}")
+            return array
+
+        # PIL 图片为 RGB，PaddleOCR 按 BGR 处理数组，需与 cv2 解码结果保持一致
+        if isinstance(image, _pil_image().Image):
+            cv2 = _cv2()
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+
+        return np.asarray(image)
+
+    @staticmethod
+    def _format_result(result, return_details: bool) -> List[Dict[str, Any]]:
+        """
+        将 PaddleOCR 原始输出整理为结果列表
+
+        Args:
+            result: PaddleOCR.ocr 的返回值
+            return_details: 是否保留坐标和置信度
+
+        Returns:
+            识别结果列表
+        """
         if result is None or not result:
             return []
 
-        # 格式化结果
-        formatted_results = []
-        for line_group in result:
-            if line_group is None:
-                continue
-            for line in line_group:
-                bbox, (text, confidence) = line
-
-                if return_details:
-                    formatted_results.append({
-                        "text": text,
-                        "bbox": bbox,
-                        "confidence": float(confidence)
-                    })
-                else:
-                    formatted_results.append({
-                        "text": text
-                    })
-
-        return formatted_results
+        # 展开各组识别行（无结果的组为 None）
+        lines = [line for line_group in result if line_group for line in line_group]
+
+        # 每行格式为 [bbox, (text, confidence)]
+        if return_details:
+            return [
+                {"text": line[1][0], "bbox": line[0], "confidence": float(line[1][1])}
+                for line in lines
+            ]
+        return [{"text": line[1][0]} for line in lines]
 
     def recognize_to_text(
         self,
@@ -5,12 +5,21 @@
 """
 import os
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    # 优先使用 libyaml 的 C 实现，解析速度约为纯 Python 版本的 10 倍
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 
 class ConfigLoader:
     """配置加载器"""
 
+    # 已解析的配置文件缓存: {路径: (修改时间, 配置字典)}
+    _cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
     def __init__(self, config_dir: str = "config"):
         """
         初始化配置加载器
@@ -60,7 +69,7 @@ class ConfigLoader:
 
     def _load_yaml(self, filename: str) -> Dict[str, Any]:
         """
-        加载 YAML 文件
+        加载 YAML 文件（文件未修改时直接返回缓存结果）
 
         Args:
             filename: 配置文件名
@@ -70,11 +79,20 @@ class ConfigLoader:
         """
         path = os.path.join(self.config_dir, filename)
 
-        if not os.path.exists(path):
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
             raise FileNotFoundError(f"配置文件不存在: {path}")
 
-        with open(path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            data = yaml.load(f.read(), Loader=SafeLoader) or {}
+
+        self._cache[path] = (mtime, data)
+        return data
 
     @property
     def settings(self) -> Dict[str, Any]:
@@ -4,10 +4,111 @@
 配置和管理日志输出
 """
 import os
+import time
+import atexit
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
 from typing import Optional
 
 
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    使用较大写缓冲区的滚动文件处理器
+
+    写入每条记录后不立即刷新，由调用方（_BatchMemoryHandler）在一批记录写完后统一 flush；
+    文件大小按已写入内容的编码字节数累计，避免 seek/tell 导致缓冲区被提前刷新。
+    """
+
+    buffer_size = 65536
+
+    def _open(self):
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors
+        )
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+
+    def _encoded_size(self, msg: str) -> int:
+        """按文件编码计算字节数（中文按 UTF-8 每字 3 字节）"""
+        return len(msg.encode(self.encoding or "utf-8", errors="replace"))
+
+    def shouldRollover(self, record) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            return False
+        msg = self.format(record) + self.terminator
+        return self._size + self._encoded_size(msg) >= self.maxBytes
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            size = self._encoded_size(msg)
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + size >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+        except Exception:
+            self.handleError(record)
+
+
+class _BatchMemoryHandler(MemoryHandler):
+    """
+    内存缓冲处理器：批量转发记录后只刷新一次目标处理器
+
+    除条数和级别外，距上次刷新超过 flush_interval 秒时也会刷新，
+    避免日志量少时记录长时间停留在内存中。
+    """
+
+    def __init__(self, capacity: int, flushLevel: int, target, flush_interval: float = 5.0):
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record) -> bool:
+        return (
+            super().shouldFlush(record)
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self):
+        with self.lock:
+            super().flush()
+            if self.target:
+                self.target.flush()
+            self._last_flush = time.monotonic()
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """同一秒内的记录复用已格式化的时间字符串，避免每条记录都调用 strftime"""
+
+    def __init__(self, fmt: str, datefmt: str):
+        super().__init__(fmt, datefmt=datefmt, style='%')
+        # (秒, 格式化结果)，整体替换以保证多线程下两者一致
+        self._cached = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, cached_time = self._cached
+        if second != cached_second:
+            cached_time = super().formatTime(record, datefmt)
+            self._cached = (second, cached_time)
+        return cached_time
+
+
+# 所有处理器共用的日志格式
+_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
 class Logger:
     """日志工具类"""
 
@@ -36,6 +137,11 @@ class Logger:
         if name in cls._loggers:
             return cls._loggers[name]
 
+        # 日志格式中不使用线程、进程信息，跳过这些字段的收集
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
         logger = logging.getLogger(name)
         logger.setLevel(logging.DEBUG)
 
@@ -46,24 +152,36 @@ class Logger:
         # 创建日志目录
         os.makedirs(log_dir, exist_ok=True)
 
-        # 文件处理器
+        # 文件处理器（单个文件最大 10MB，保留 5 个备份）
         log_file = os.path.join(log_dir, f"{name}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = _BufferedRotatingFileHandler(
+            log_file,
+            maxBytes=10_000_000,
+            backupCount=5,
+            encoding='utf-8'
+        )
         file_handler.setLevel(level)
 
+        # 内存缓冲：攒满 1024 条、遇到 ERROR 或距上次写入超过 5 秒时批量写入文件
+        memory_handler = _BatchMemoryHandler(
+            capacity=1024,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+            flush_interval=5.0
+        )
+        memory_handler.setLevel(level)
+        atexit.register(memory_handler.flush)
+
         # 控制台处理器
         console_handler = logging.StreamHandler()
         console_handler.setLevel(console_level)
 
-        # 日志格式
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        # 日志格式（文件和控制台共用同一个格式化器）
+        formatter = _CachedTimeFormatter(_LOG_FORMAT, _DATE_FORMAT)
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
 
-        logger.addHandler(file_handler)
+        logger.addHandler(memory_handler)
         logger.addHandler(console_handler)
 
         cls._loggers[name] = logger
@@ -0,0 +1,45 @@
+"""
+OCREngine 图片转换测试
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+Image = pytest.importorskip("PIL.Image")
+
+from src.ocr.ocr_engine import OCREngine
+
+
+def _red_image():
+    """纯红色 RGB 图片"""
+    return Image.new("RGB", (4, 2), (255, 0, 0))
+
+
+def test_pil_image_is_converted_to_bgr():
+    array = OCREngine._to_array(_red_image())
+
+    assert array.shape == (2, 4, 3)
+    assert array[0, 0].tolist() == [0, 0, 255]
+
+
+def test_pil_non_rgb_image_is_converted_to_bgr():
+    array = OCREngine._to_array(_red_image().convert("RGBA"))
+
+    assert array.shape == (2, 4, 3)
+    assert array[0, 0].tolist() == [0, 0, 255]
+
+
+def test_pil_and_path_inputs_have_same_channel_order(tmp_path):
+    path = tmp_path / "red.png"
+    _red_image().save(path)
+
+    from_path = OCREngine._to_array(path)
+    from_pil = OCREngine._to_array(Image.open(path))
+
+    assert np.array_equal(from_path, from_pil)
+
+
+def test_ndarray_is_returned_unchanged():
+    array = np.zeros((2, 4, 3), dtype=np.uint8)
+
+    assert OCREngine._to_array(array) is array
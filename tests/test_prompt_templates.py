@@ -0,0 +1,41 @@
+"""
+PromptTemplates 渲染测试
+"""
+import pytest
+
+from src.ai.prompt_templates import PromptTemplates
+
+
+VALUES = {
+    "question": "1+1=?",
+    "standard_answer": "2",
+    "student_answer": "2",
+    "max_points": 10,
+    "width": 6,
+    "precision": 2
+}
+
+
+@pytest.mark.parametrize("template", [
+    PromptTemplates.DEFAULT_JUDGE_TEMPLATE,
+    PromptTemplates.STRICT_JUDGE_TEMPLATE,
+    PromptTemplates.LENIENT_JUDGE_TEMPLATE,
+    "题目：{question!r} 满分：{max_points:>4}",
+    "{{字面花括号}} {student_answer}",
+    "x {question:{width}} y",
+    "{max_points:{width}.{precision}f}",
+])
+def test_format_template_matches_str_format(template):
+    assert PromptTemplates.format_template(template, **VALUES) == template.format(**VALUES)
+
+
+def test_render_template_matches_str_format():
+    template = "得分 {max_points:>{width}} / {standard_answer}"
+    plan = PromptTemplates.compile_template(template)
+
+    assert PromptTemplates.render_template(plan, VALUES) == template.format(**VALUES)
+
+
+def test_missing_field_raises_key_error():
+    with pytest.raises(KeyError):
+        PromptTemplates.format_template("{unknown}", **VALUES)
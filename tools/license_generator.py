@@ -2,13 +2,78 @@
 授权码生成器
 
 用于生成和验证阅卷系统的授权码
+
+签名（hmac/hashlib）、打包（struct）和编码（base64）均由标准库的 C 实现完成，
+无需额外编译；批量颁发请使用 LicenseServer.issue_licenses。
 """
+import base64
+import functools
 import hashlib
-import json
+import hmac
+import struct
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import secrets
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# 当前授权码版本前缀（HMAC-SHA256 签名，无额外校验位）
+LICENSE_PREFIX = "GS2-"
+# 旧版授权码前缀（SHA256(数据+密钥) 签名 + MD5 校验位），仅用于验证已发放的授权码
+LEGACY_LICENSE_PREFIX = "GS1-"
+
+# GS2 数据布局：签发时间(u32) + 到期时间(u32) + 授权类型(u8) + 用户ID长度(u8) + 用户ID(UTF-8)
+_PAYLOAD_HEADER = struct.Struct("<IIBB")
+# 同一批授权共用的定长头部分（不含用户ID长度）
+_BATCH_HEADER = struct.Struct("<IIB")
+# 时间字段为 u32，最晚可表示到 2106-02-07
+_MAX_TIMESTAMP = 0xFFFFFFFF
+# 签名长度（HMAC-SHA256 前 16 字节，追加在数据之后）
+_SIGNATURE_SIZE = 16
+# GS2 使用 URL 安全的 Base64（- 和 _），授权码可直接放入 URL 和文件名；解码时拒绝非法字符
+_b64encode = base64.urlsafe_b64encode
+_b64decode = functools.partial(base64.b64decode, altchars=b"-_", validate=True)
+# GS2 授权码的最短长度（前缀 + 空用户ID时数据和签名的 Base64 长度），更短的直接拒绝
+_MIN_CODE_LENGTH = len(LICENSE_PREFIX) + (_PAYLOAD_HEADER.size + _SIGNATURE_SIZE + 2) // 3 * 4
+
+# 授权类型与编码值的映射
+LICENSE_TYPES = {"standard": 0, "pro": 1, "enterprise": 2}
+_LICENSE_TYPE_NAMES = {code: name for name, code in LICENSE_TYPES.items()}
+
+# 每天的秒数
+_SEC_PER_DAY = 86400
+
+# 有效期显示格式
+_DATE_FORMAT = "%Y-%m-%d"
+
+# 验证结果缓存条数；缓存按分钟分桶，过期判断最多滞后一分钟
+_VERIFY_CACHE_SIZE = 4096
+
+
+def _unix_time() -> int:
+    """当前 Unix 时间（整数秒）"""
+    return time.time_ns() // 1_000_000_000
+
+
+def _format_date(timestamp: int) -> str:
+    """将时间戳格式化为日期字符串"""
+    return datetime.fromtimestamp(timestamp).strftime(_DATE_FORMAT)
+
+
+@functools.lru_cache(maxsize=1)
+def _json_loader():
+    """旧版授权码的 JSON 解析函数（首次解析旧版授权码时导入，优先使用 orjson）"""
+    try:
+        import orjson
+    except ImportError:
+        import json
+        return json.loads
+    return orjson.loads
+
+
+def _json_loads(data: bytes) -> Dict:
+    """解析旧版授权码中的 JSON 数据"""
+    return _json_loader()(data)
 
 
 class LicenseGenerator:
@@ -21,7 +86,25 @@ class LicenseGenerator:
         Args:
             secret_key: 密钥，用于签名和验证
         """
-        self.secret_key = secret_key or secrets.token_hex(32)
+        # 验证结果按实例缓存，键为 (授权码, 分钟)，不需要对 self 做哈希
+        self._verify_cached = functools.lru_cache(maxsize=_VERIFY_CACHE_SIZE)(self._verify_uncached)
+        if secret_key is None:
+            import secrets
+            secret_key = secrets.token_hex(32)
+        self.set_secret_key(secret_key)
+
+    def set_secret_key(self, secret_key: str) -> None:
+        """
+        设置（轮换）密钥，并清空验证结果缓存
+
+        Args:
+            secret_key: 新密钥
+        """
+        self.secret_key = secret_key
+        self._secret_key_bytes = secret_key.encode()
+        # 预先完成密钥填充的 HMAC 状态，每次签名复制后使用
+        self._hmac_proto = hmac.new(self._secret_key_bytes, None, hashlib.sha256)
+        self._verify_cached.cache_clear()
 
     def generate(
         self,
@@ -40,55 +123,104 @@ class LicenseGenerator:
         Returns:
             包含授权信息的字典
         """
-        # 时间戳
-        timestamp = int(time.time())
-        expiry = timestamp + (valid_days * 24 * 60 * 60)
-
-        # 创建授权数据
-        license_data = {
-            "user_id": user_id,
-            "issued_at": timestamp,
-            "expiry": expiry,
-            "license_type": license_type
-        }
+        return self.generate_batch([user_id], valid_days, license_type)[0]
 
-        # 生成签名
-        signature = self._sign(license_data)
+    def generate_batch(
+        self,
+        user_ids: List[str],
+        valid_days: int = 365,
+        license_type: str = "standard"
+    ) -> List[Dict[str, str]]:
+        """
+        批量生成授权码（同一批使用相同的签发时间和有效期）
 
-        # 编码为授权码
-        license_code = self._encode(license_data, signature)
+        Args:
+            user_ids: 用户ID列表
+            valid_days: 有效天数
+            license_type: 授权类型 (standard, pro, enterprise)
 
-        return {
-            "license_code": license_code,
-            "user_id": user_id,
-            "valid_days": valid_days,
-            "expiry": datetime.fromtimestamp(expiry).strftime("%Y-%m-%d"),
-            "license_type": license_type
-        }
+        Returns:
+            授权信息字典列表，顺序与 user_ids 一致
+        """
+        user_ids = list(user_ids)
+        _, expiry, codes = self._issue(user_ids, valid_days, license_type)
+        expiry_str = _format_date(expiry)
+
+        return [
+            {
+                "license_code": license_code,
+                "user_id": user_id,
+                "valid_days": valid_days,
+                "expiry": expiry_str,
+                "license_type": license_type
+            }
+            for user_id, license_code in zip(user_ids, codes)
+        ]
+
+    def _issue(
+        self,
+        user_ids: List[str],
+        valid_days: int,
+        license_type: str
+    ) -> Tuple[int, int, List[str]]:
+        """
+        为一批用户生成授权码
+
+        Returns:
+            (签发时间戳, 到期时间戳, 授权码列表)
+        """
+        if license_type not in LICENSE_TYPES:
+            raise ValueError(f"未知的授权类型: {license_type}")
+
+        # 时间戳、有效期、授权类型整批相同，定长头只打包一次
+        timestamp = _unix_time()
+        expiry = timestamp + valid_days * _SEC_PER_DAY
+        if not 0 <= expiry <= _MAX_TIMESTAMP:
+            raise ValueError(f"有效天数超出范围: {valid_days}（到期时间最晚为 2106-02-07）")
+        batch_header = _BATCH_HEADER.pack(timestamp, expiry, LICENSE_TYPES[license_type])
+
+        codes = []
+        for user_id in user_ids:
+            # 打包授权数据，签名和编码使用同一份字节
+            data_bytes = self._pack(batch_header, user_id)
+            codes.append(self._encode(data_bytes, self._sign_bytes(data_bytes)))
+
+        return timestamp, expiry, codes
 
     def verify(self, license_code: str) -> Dict[str, any]:
         """
         验证授权码
 
+        同一授权码在同一分钟内的重复验证直接返回缓存结果。
+
         Args:
             license_code: 授权码
 
         Returns:
             验证结果字典
         """
+        bucket = time.time_ns() // 60_000_000_000
+        return dict(self._verify_cached(license_code, bucket))
+
+    def _verify_uncached(self, license_code: str, bucket: int) -> Dict[str, any]:
+        """验证授权码（bucket 仅作为缓存键的一部分）"""
         try:
             # 解码授权码
-            license_data, signature = self._decode(license_code)
+            data_bytes, signature, legacy = self._decode(license_code)
 
-            # 验证签名
-            if not self._verify_signature(license_data, signature):
+            # 验证签名（针对收到的原始字节，不重新序列化）
+            if not self._verify_signature(data_bytes, signature, legacy):
                 return {
                     "valid": False,
                     "reason": "签名验证失败"
                 }
 
+            license_data = _json_loads(data_bytes) if legacy else self._unpack(data_bytes)
+
             # 检查有效期
-            if time.time() > license_data["expiry"]:
+            expiry = license_data["expiry"]
+            now = _unix_time()
+            if now > expiry:
                 return {
                     "valid": False,
                     "reason": "授权已过期"
@@ -98,8 +230,9 @@ class LicenseGenerator:
                 "valid": True,
                 "user_id": license_data["user_id"],
                 "license_type": license_data["license_type"],
-                "expiry": datetime.fromtimestamp(license_data["expiry"]).strftime("%Y-%m-%d"),
-                "days_left": (datetime.fromtimestamp(license_data["expiry"]) - datetime.now()).days
+                "expiry": _format_date(expiry),
+                # 按整秒计算剩余整天数
+                "days_left": (expiry - now) // _SEC_PER_DAY
             }
 
         except Exception as e:
@@ -108,54 +241,83 @@ class LicenseGenerator:
                 "reason": f"授权码格式错误: {str(e)}"
             }
 
-    def _sign(self, data: Dict) -> str:
-        """生成签名"""
-        data_str = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(f"{data_str}{self.secret_key}".encode()).hexdigest()[:16]
+    @staticmethod
+    def _pack(batch_header: bytes, user_id: str) -> bytes:
+        """将授权数据打包为定长头 + 用户ID长度 + 用户ID"""
+        user_id_bytes = user_id.encode()
+        if len(user_id_bytes) > 255:
+            raise ValueError("用户ID过长（最多 255 字节）")
 
-    def _verify_signature(self, data: Dict, signature: str) -> bool:
-        """验证签名"""
-        return self._sign(data) == signature
+        return batch_header + bytes((len(user_id_bytes),)) + user_id_bytes
 
-    def _encode(self, data: Dict, signature: str) -> str:
-        """编码为授权码"""
-        data_str = json.dumps(data, sort_keys=True)
-        combined = f"{data_str}.{signature}"
+    @staticmethod
+    def _unpack(data_bytes: bytes) -> Dict:
+        """解包授权数据"""
+        issued_at, expiry, type_code, user_id_len = _PAYLOAD_HEADER.unpack_from(data_bytes)
+        user_id_bytes = data_bytes[_PAYLOAD_HEADER.size:]
+        if len(user_id_bytes) != user_id_len:
+            raise ValueError("授权数据长度错误")
+
+        return {
+            "user_id": user_id_bytes.decode(),
+            "issued_at": issued_at,
+            "expiry": expiry,
+            "license_type": _LICENSE_TYPE_NAMES[type_code]
+        }
 
-        # Base64 编码 + 添加版本和校验位
-        import base64
-        encoded = base64.b64encode(combined.encode()).decode()
+    def _sign_bytes(self, data_bytes: bytes) -> bytes:
+        """生成签名（HMAC-SHA256，取前 16 字节）"""
+        h = self._hmac_proto.copy()
+        h.update(data_bytes)
+        return h.digest()[:_SIGNATURE_SIZE]
 
-        # 添加版本号和简单校验
-        checksum = hashlib.md5(encoded.encode()).hexdigest()[:4]
-        return f"GS1-{encoded}-{checksum}"
+    def _sign_legacy(self, data_bytes: bytes) -> str:
+        """生成旧版（GS1）签名"""
+        return hashlib.sha256(data_bytes + self._secret_key_bytes).hexdigest()[:16]
+
+    def _verify_signature(self, data_bytes: bytes, signature, legacy: bool = False) -> bool:
+        """验证签名（常量时间比较）"""
+        expected = self._sign_legacy(data_bytes) if legacy else self._sign_bytes(data_bytes)
+        return hmac.compare_digest(expected, signature)
+
+    def _encode(self, data_bytes: bytes, signature: bytes) -> str:
+        """编码为授权码"""
+        # URL 安全的 Base64 编码 + 添加版本号（签名已保证数据完整性，不再附加校验位）
+        encoded = _b64encode(data_bytes + signature).decode()
+        return f"{LICENSE_PREFIX}{encoded}"
 
     def _decode(self, license_code: str) -> tuple:
-        """解码授权码"""
-        # 移除版本前缀
-        if not license_code.startswith("GS1-"):
+        """
+        解码授权码
+
+        Returns:
+            (授权数据的原始字节, 签名, 是否为旧版授权码)
+        """
+        if license_code.startswith(LICENSE_PREFIX):
+            # 先按长度排除，避免对明显错误的输入做 Base64 解码
+            if len(license_code) < _MIN_CODE_LENGTH:
+                raise ValueError("授权码长度错误")
+            decoded = _b64decode(license_code[len(LICENSE_PREFIX):])
+            return decoded[:-_SIGNATURE_SIZE], decoded[-_SIGNATURE_SIZE:], False
+
+        if not license_code.startswith(LEGACY_LICENSE_PREFIX):
             raise ValueError("无效的授权码版本")
 
-        # 分离校验位
-        parts = license_code[4:].split("-")
+        # 旧版授权码：分离并验证校验位
+        parts = license_code[len(LEGACY_LICENSE_PREFIX):].split("-")
         if len(parts) != 2:
             raise ValueError("授权码格式错误")
 
+        # 旧版校验位必须沿用 MD5 才能验证已发放的授权码，长度不对时无需计算
         encoded, checksum = parts
-
-        # 验证校验位
-        if checksum != hashlib.md5(encoded.encode()).hexdigest()[:4]:
+        if len(checksum) != 4 or checksum != hashlib.md5(encoded.encode()).hexdigest()[:4]:
             raise ValueError("校验位验证失败")
 
-        # Base64 解码
-        import base64
-        decoded = base64.b64decode(encoded).decode()
+        # Base64 解码，分离 JSON 数据和十六进制签名
+        decoded = base64.b64decode(encoded)
+        data_bytes, signature = decoded.rsplit(b".", 1)
 
-        # 分离数据和签名
-        data_str, signature = decoded.rsplit(".", 1)
-        data = json.loads(data_str)
-
-        return data, signature
+        return data_bytes, signature.decode(), True
 
 
 class LicenseServer:
@@ -163,7 +325,13 @@ class LicenseServer:
 
     def __init__(self, secret_key: str = None):
         self.generator = LicenseGenerator(secret_key)
-        self.issued_licenses = []
+
+        # 已颁发的授权按列存储：每列一个数组，同一下标为同一条授权
+        self._codes: List[str] = []
+        self._user_ids: List[str] = []
+        self._valid_days = array("I")
+        self._expiries = array("I")
+        self._types = array("B")
 
     def issue_license(
         self,
@@ -180,9 +348,46 @@ class LicenseServer:
         Returns:
             授权信息
         """
-        license_info = self.generator.generate(user_id, valid_days)
-        self.issued_licenses.append(license_info)
-        return license_info
+        return self.issue_licenses([user_id], valid_days)[0]
+
+    def issue_licenses(
+        self,
+        user_ids: List[str],
+        valid_days: int = 365,
+        license_type: str = "standard"
+    ) -> List[Dict[str, str]]:
+        """
+        批量颁发授权码
+
+        Args:
+            user_ids: 用户ID列表
+            valid_days: 有效天数
+            license_type: 授权类型 (standard, pro, enterprise)
+
+        Returns:
+            授权信息列表，顺序与 user_ids 一致
+        """
+        if valid_days < 0:
+            raise ValueError("有效天数不能为负数")
+
+        # 可能传入迭代器，先转为列表，生成授权码和写入用户ID列使用同一份数据
+        user_ids = list(user_ids)
+        _, expiry, codes = self.generator._issue(user_ids, valid_days, license_type)
+
+        # 先完成所有列的类型转换，全部成功后再写入，保证各列长度一致
+        count = len(codes)
+        valid_days_column = array("I", [valid_days]) * count
+        expiries_column = array("I", [expiry]) * count
+        types_column = array("B", [LICENSE_TYPES[license_type]]) * count
+
+        start = len(self._codes)
+        self._codes.extend(codes)
+        self._user_ids.extend(user_ids)
+        self._valid_days.extend(valid_days_column)
+        self._expiries.extend(expiries_column)
+        self._types.extend(types_column)
+
+        return [self._row(i) for i in range(start, start + count)]
 
     def verify_license(self, license_code: str) -> Dict[str, any]:
         """
@@ -198,7 +403,33 @@ class LicenseServer:
 
     def list_licenses(self) -> List[Dict]:
         """列出所有已颁发的授权"""
-        return self.issued_licenses
+        return list(self.iter_licenses())
+
+    def iter_licenses(self) -> Iterator[Dict]:
+        """逐条生成已颁发的授权信息（不一次性构建全部字典）"""
+        for i in range(len(self._codes)):
+            yield self._row(i)
+
+    @property
+    def issued_licenses(self) -> List[Dict]:
+        """已颁发的授权列表（兼容旧接口）"""
+        return self.list_licenses()
+
+    @property
+    def active_count(self) -> int:
+        """未过期的授权数量"""
+        now = _unix_time()
+        return sum(1 for expiry in self._expiries if expiry > now)
+
+    def _row(self, i: int) -> Dict[str, str]:
+        """按下标组装一条授权信息"""
+        return {
+            "license_code": self._codes[i],
+            "user_id": self._user_ids[i],
+            "valid_days": self._valid_days[i],
+            "expiry": _format_date(self._expiries[i]),
+            "license_type": _LICENSE_TYPE_NAMES[self._types[i]]
+        }
 
 
 def main():
@@ -223,7 +454,11 @@ def main():
             print("错误: 生成授权码需要 --user-id 参数")
             return
 
-        info = generator.generate(args.user_id, args.days)
+        try:
+            info = generator.generate(args.user_id, args.days)
+        except ValueError as e:
+            print(f"错误: {e}")
+            return
         print("\n" + "="*50)
         print("授权码生成成功")
         print("="*50)